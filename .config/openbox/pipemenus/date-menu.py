@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 #
 # DATE-MENU by Derek Taylor (DistroTube)
-# A simple python script that creates an openbox pipemenu that displays time and date.
+# A python script that creates an openbox pipemenu that displays time and date, a calendar
+# of the month with ISO week numbers, clocks for other timezones and upcoming events from an
+# iCalendar (.ics) file. Earlier and later months open as submenus of their own, so only the
+# current month is drawn until one is opened. The parsed events are cached by ics.py (keep it
+# next to this script) and only parsed again when the .ics file changes.
 
 # This program is free software: you can redistribute it and/or modify it under the terms of
 # the GNU General Public License version 3 as published by the Free Software Foundation.
@@ -13,30 +17,127 @@
 # with this program. If not, see: http://www.gnu.org/licenses
 
 # Copy this file somewhere on your path and make it executable.
+# Keep pipemenu.py and ics.py from the same directory next to it.
 # Add the following line somewhere to your /.config/openbox/menu.xml
 #       <menu execute="/PATH/TO/date-menu.py" id="datetime" label="Time and Date"/>
 # Be sure to change the PATH/TO to the correct path to this file.
 # Reconfigure openbox.
 
 # SETTINGS
- 
+
+# Clocks shown under WORLD CLOCKS, as IANA timezone names
+worldClocks = ['America/Los_Angeles', 'Europe/London', 'Asia/Tokyo']
+# Events file, e.g. exported from Thunderbird or Google Calendar; no UPCOMING section if missing
+eventsFile = '~/.local/share/calendar/events.ics'
+# How many days ahead UPCOMING looks, and at most how many events it lists
+eventDays = 14
+maxEvents = 25
+
 import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+import ics
+import pipemenu
+
+# Figure space: as wide as a digit, so single digit days line up
+PAD = '\u2007'
+
+scriptPath = os.path.realpath(__file__)
+menuCmd = "'" + scriptPath.replace("'", "'\\''") + "'"
+
+# Monday first rows of the month, each labelled with its ISO week number and
+# today's date in brackets
+def render_month(doc, year, month, today):
+    doc.item('Wk' + PAD + '  Mo  Tu  We  Th  Fr  Sa  Su')
+    first = datetime.date(year, month, 1)
+    monday = first - datetime.timedelta(days=first.weekday())
+    while monday.month == month or monday <= first:
+        week = [monday + datetime.timedelta(days=i) for i in range(7)]
+        monday += datetime.timedelta(days=7)
+        cells = []
+        for day in week:
+            if day.month != month:
+                cells.append(PAD * 2 + ' ')
+            elif day == today:
+                cells.append('[' + str(day.day).rjust(2, PAD) + ']')
+            else:
+                cells.append(' ' + str(day.day).rjust(2, PAD) + ' ')
+        doc.item(str(week[0].isocalendar()[1]).rjust(2, PAD) + PAD + ' ' + ''.join(cells))
+
+# Earlier and later months, opened on demand by running this script again
+def render_neighbours(doc, year, month):
+    for delta in (-1, 1):
+        y, m = divmod(year * 12 + month - 1 + delta, 12)
+        first = datetime.date(y, m + 1, 1)
+        doc.menu('datetime-' + first.strftime('%Y-%m'), first.strftime('%B %Y'),
+                 execute=menuCmd + ' month ' + first.strftime('%Y-%m'))
+
+def render_clocks(doc, now):
+    for name in worldClocks:
+        tz = ics.zone(name)
+        if tz is None:
+            continue
+        there = now.astimezone(tz)
+        offset = there.strftime('%z')
+        doc.item('%s  %s  %s (UTC%s:%s)' % (there.strftime('%I:%M %p'), there.strftime('%a'),
+                                            name.rsplit('/', 1)[-1].replace('_', ' '), offset[:3], offset[3:]))
 
+# Events by day, at most maxEvents of them
+def render_events(doc, now):
+    found = ics.upcoming(ics.load(os.path.expanduser(eventsFile)), eventDays, now)
+    if not found:
+        doc.item('Nothing in the next %d days' % eventDays)
+        return
+    lastDay = None
+    for start, allDay, summary, location in found[:maxEvents]:
+        day = start.date()
+        if day != lastDay:
+            offset = (day - now.date()).days
+            doc.separator('Today' if offset == 0 else 'Tomorrow' if offset == 1 else start.strftime('%A, %B %d'))
+            lastDay = day
+        label = ('All day' if allDay else start.strftime('%I:%M %p')) + '  ' + summary
+        doc.item(label + ('  @ ' + location if location else ''))
+    if len(found) > maxEvents:
+        doc.item('... and %d more' % (len(found) - maxEvents))
+
+# OPENBOX PIPEMENU
+
+doc = pipemenu.Document()
 dt = datetime.datetime.now()
+
+if sys.argv[1:2] == ['month']:
+    try:
+        year, month = map(int, sys.argv[2].split('-'))
+        datetime.date(year, month, 1)
+    except (IndexError, ValueError):
+        sys.exit('usage: date-menu.py [month YYYY-MM]')
+    render_month(doc, year, month, dt.date())
+    doc.separator()
+    render_neighbours(doc, year, month)
+    doc.write()
+    sys.exit(0)
+
 theDate = dt.strftime('%A, %B %d, %Y')
-theTime = dt.strftime('%I:%M %p %Z')
+theTime = dt.astimezone().strftime('%I:%M %p %Z')
 theDay = dt.strftime('%j')
 theWeek = dt.strftime('%U')
+isoWeek = dt.strftime('%V')
 
-# OPENBOX PIPEMENU
-
-print ('<?xml version=\"1.0\" encoding=\"UTF-8\"?>')
-print ('<openbox_pipe_menu>')
-print ('<separator />')
-print ('<item label="DATE AND TIME" />')
-print ('<separator />')
-print ('<item label="'+theTime+'"/>')
-print ('<item label="'+theDate+'"/>')
-print ('<item label="'+'Day '+theDay+'"/>')
-print ('<item label="'+'Week '+theWeek+'"/>')
-print ('</openbox_pipe_menu>')
+doc.header('DATE AND TIME')
+doc.item(theTime)
+doc.item(theDate)
+doc.item('Day '+theDay)
+doc.item('Week '+isoWeek+' (ISO), '+theWeek+' (US)')
+doc.header(dt.strftime('%B %Y').upper())
+render_month(doc, dt.year, dt.month, dt.date())
+doc.separator()
+render_neighbours(doc, dt.year, dt.month)
+if worldClocks:
+    doc.header('WORLD CLOCKS')
+    render_clocks(doc, dt.astimezone())
+if os.path.exists(os.path.expanduser(eventsFile)):
+    doc.header('UPCOMING')
+    render_events(doc, dt)
+doc.write()
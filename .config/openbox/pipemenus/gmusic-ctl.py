@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+#
+# GMUSIC-CTL
+# Sends one command (PlayPause, Play, Pause, Stop, NextSong, PrevSong, IncVolume,
+# DecVolume, ShowHide or Quit) to gmusicbrowser. The gmusicbrowser pipemenu runs it
+# for its player items.
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of
+# the GNU General Public License version 3 as published by the Free Software Foundation.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see: http://www.gnu.org/licenses
+#
+# Usage: gmusic-ctl.py COMMAND
+# When gmusicd.py is running the command is queued there in one socket round trip.
+# Otherwise this process turns into `gmusicbrowser -cmd COMMAND` as before.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+from gmusic import control
+
+if len(sys.argv) != 2 or sys.argv[1] not in control.COMMANDS:
+    sys.exit('usage: gmusic-ctl.py {%s}' % ','.join(sorted(control.COMMANDS)))
+
+if not control.send(sys.argv[1]):
+    os.execvp('gmusicbrowser', ['gmusicbrowser', '-cmd', sys.argv[1]])
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+#
+# GMUSIC-INDEX
+# Updates the music library index the gmusicbrowser pipemenu's Library submenus are
+# built from. Only songs added or changed since the last run have their tags read, and
+# only folders changed since then (anything added, removed or renamed in them) are read.
+# Songs retagged in place are picked up by the daily full rescan, or at once with --full.
+# The pipemenu starts it in the background by itself when the index is over an hour
+# old; it can also be run by hand or from your openbox autostart.
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of
+# the GNU General Public License version 3 as published by the Free Software Foundation.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see: http://www.gnu.org/licenses
+#
+# Usage: gmusic-index.py MUSIC_DIR [-v] [--full]
+# Install python-mutagen for real tags and song lengths; without it artist, album and
+# title come from the Artist/Album/NN Title.ext file layout.
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+from gmusic import library
+
+if len(sys.argv) < 2:
+    sys.exit('usage: gmusic-index.py MUSIC_DIR [-v] [--full]')
+
+start = time.perf_counter()
+changed, removed = library.update(os.path.expanduser(sys.argv[1]), full='--full' in sys.argv[2:])
+if '-v' in sys.argv[2:]:
+    print('%d songs added or changed, %d removed in %.2f s' % (changed, removed, time.perf_counter() - start))
@@ -0,0 +1,4 @@
+# GMUSIC
+# Helpers for the gmusicbrowser pipemenu: reading what gmusicbrowser leaves in
+# its config directory in process, and caching the results between menu opens
+# so that opening the menu costs a stat() rather than a handful of shells.
@@ -0,0 +1,55 @@
+# GMUSIC - CACHE
+# Small JSON files in $XDG_CACHE_HOME/gmusicbrowser-menu that survive between
+# menu opens (and reboots). Every entry is stored with the key it was built
+# for, typically a file's (mtime, size), and is only used while that key still
+# matches.
+
+import json
+import os
+
+def cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    path = os.path.join(base, 'gmusicbrowser-menu')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def cache_file(name):
+    return os.path.join(cache_dir(), name + '.json')
+
+# The value stored under name if it was stored for key, else None
+def load(name, key):
+    try:
+        with open(cache_file(name)) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get('key') != key:
+        return None
+    return entry.get('value')
+
+# (key, value) of whatever is stored under name, for refreshing a stale entry
+# incrementally; (None, None) when there is nothing
+def load_any(name):
+    try:
+        with open(cache_file(name)) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+    return entry.get('key'), entry.get('value')
+
+def save(name, key, value):
+    path = cache_file(name)
+    try:
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'key': key, 'value': value}, f, separators=(',', ':'))
+        os.replace(path + '.tmp', path)
+    except OSError:
+        pass
+
+# (mtime in ns, size) of path, or None when it does not exist
+def file_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
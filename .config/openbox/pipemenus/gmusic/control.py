@@ -0,0 +1,136 @@
+# GMUSIC - CONTROL
+# Sends the pipemenu's player commands (Play, NextSong, ...) to gmusicbrowser
+# without starting `gmusicbrowser -cmd X`, which is a whole new Perl process
+# that then has to find the running player.
+#
+# gmusicd.py keeps one connection to the player open: gmusicbrowser's DBus
+# interface (org.gmusicbrowser.RunCommand) through dbus-python when that is
+# installed, `gmusicbrowser -cmd` otherwise. Menu items hand the command to
+# the daemon over a Unix socket using the sysmon service protocol: straight
+# from the shell with socat when it is installed (see menu_command()), through
+# gmusic-ctl.py otherwise. A dispatcher thread in the daemon runs commands in
+# the order they came in, so a burst of NextSong clicks is neither dropped nor
+# slowed down by the player.
+#
+#   <command>  ->  "ok" once queued, empty for unknown commands
+#   ping       ->  "pong"
+
+import os
+import queue
+import shlex
+import subprocess
+import sys
+import threading
+
+from sysmon import service
+
+COMMANDS = frozenset((
+    'PlayPause', 'Play', 'Pause', 'Stop', 'NextSong', 'PrevSong',
+    'IncVolume', 'DecVolume', 'ShowHide', 'Quit',
+))
+
+DBUS_NAME = 'org.gmusicbrowser'
+DBUS_PATH = '/org/gmusicbrowser'
+
+def socket_path():
+    runtime = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    return os.path.join(runtime, 'gmusic-%d.sock' % os.getuid())
+
+##### CLIENT #####
+
+# True when a running gmusicd.py queued command
+def send(command, path=None):
+    return service.query(command, path or socket_path()) == b'ok\n'
+
+# What a menu item runs, with the command appended as the last argument.
+# Starting Python for gmusic-ctl.py takes longer than the whole round trip to
+# the daemon, so the command goes through socat from a plain sh instead. When
+# socat is not installed or gmusicd.py does not answer "ok", ctl runs as before
+# and falls back to gmusicbrowser -cmd itself.
+def menu_command(ctl, path=None):
+    script = ('printf "%%s\\n" "$1" | socat -t 1 - UNIX-CONNECT:%s 2>/dev/null | grep -qx ok || exec %s "$1"'
+              % (shlex.quote(path or socket_path()), shlex.quote(ctl)))
+    return 'sh -c ' + shlex.quote(script) + ' gmusic-ctl'
+
+##### PLAYERS #####
+
+# Fallback: the way the menu always did it. `gmusicbrowser -cmd` may turn into
+# the player itself when none is running, so it is not waited for; children
+# that have exited are reaped on the next command instead of piling up as
+# zombies in the long-running daemon.
+class CommandPlayer:
+    def __init__(self):
+        self.children = []
+
+    def run(self, command):
+        self.children = [child for child in self.children if child.poll() is None]
+        self.children.append(subprocess.Popen(['gmusicbrowser', '-cmd', command]))
+
+# One session bus connection for as long as the daemon runs. When gmusicbrowser
+# is not running (or was restarted) the call fails, the proxy is looked up again
+# once, and after that the command falls back to `gmusicbrowser -cmd`, which
+# also starts the player. run() is only called on the dispatcher thread, so the
+# private bus connection and the proxy are made there, on first use, and never
+# touched from another thread.
+class DBusPlayer:
+    def __init__(self):
+        import dbus
+        self.dbus = dbus
+        self.bus = None
+        self.proxy = None
+        self.fallback = CommandPlayer()
+
+    def run(self, command):
+        for _ in range(2):
+            try:
+                if self.bus is None:
+                    self.bus = self.dbus.SessionBus(private=True)
+                if self.proxy is None:
+                    self.proxy = self.bus.get_object(DBUS_NAME, DBUS_PATH)
+                self.proxy.RunCommand(command, dbus_interface=DBUS_NAME)
+                return
+            except self.dbus.DBusException:
+                self.proxy = None
+        self.fallback.run(command)
+
+def default_player():
+    try:
+        return DBusPlayer()
+    except ImportError:
+        return CommandPlayer()
+
+##### DAEMON #####
+
+# Runs queued commands one after another on a worker thread
+class Dispatcher:
+    def __init__(self, player):
+        self.player = player
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.work, daemon=True)
+        self.thread.start()
+
+    def put(self, command):
+        self.queue.put(command)
+
+    def work(self):
+        while True:
+            command = self.queue.get()
+            try:
+                self.player.run(command)
+            except Exception as e:
+                print('gmusicd: %s failed: %s' % (command, e), file=sys.stderr)
+            finally:
+                self.queue.task_done()
+
+class Server(service.Server):
+    name = 'gmusicd'
+
+    def __init__(self, player, path=None):
+        super().__init__(lambda: {'ping': b'pong\n'}, 3600, path or socket_path())
+        self.dispatcher = Dispatcher(player)
+
+    def respond(self, request):
+        if request in COMMANDS:
+            self.dispatcher.put(request)
+            return b'ok\n'
+        return super().respond(request)
@@ -0,0 +1,218 @@
+# GMUSIC - LIBRARY
+# Artist/album/title/length of every song in the music directory, kept in a
+# SQLite database in the gmusic cache directory so that the pipemenu's Library
+# submenus are a few indexed queries instead of reading tags on every open.
+#
+# update() keeps the mtime of every directory it has read. A directory whose
+# mtime is unchanged has had no files added, removed or renamed, so it is not
+# read again: its subdirectories come from the database and only the directory
+# itself is stat'ed. In directories that did change each file's mtime and size
+# are compared with the database; only new or changed files have their tags
+# read, and files that are gone are dropped, all in one transaction. Editing
+# the tags of a file in place does not change its directory, so once a day (or
+# with full=True, gmusic-index.py --full) every directory is read again. Tags come
+# from mutagen (python-mutagen) when it is installed. Without it, or for files
+# without tags, they are taken from the Artist/Album/NN Title.ext layout most
+# collections use, and lengths stay unknown.
+
+import fcntl
+import os
+import re
+import sqlite3
+import time
+from typing import NamedTuple
+
+from gmusic import cache
+
+try:
+    import mutagen
+except ImportError:
+    mutagen = None
+
+EXTENSIONS = ('.mp3', '.flac', '.ogg', '.oga', '.opus', '.m4a', '.mp4', '.aac',
+              '.wma', '.wav', '.ape', '.mpc', '.wv')
+
+UNKNOWN = 'Unknown'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tracks (
+    path TEXT PRIMARY KEY,
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    artist TEXT NOT NULL,
+    album TEXT NOT NULL,
+    title TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    seconds INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tracks_by_artist ON tracks (artist COLLATE NOCASE, album COLLATE NOCASE, number);
+CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+'''
+
+# Seconds between updates that read every directory
+FULL_INTERVAL = 86400
+
+class Track(NamedTuple):
+    path: str
+    artist: str
+    album: str
+    title: str
+    number: int
+    seconds: int
+
+def db_path():
+    return os.path.join(cache.cache_dir(), 'library.sqlite3')
+
+def connect(path=None):
+    db = sqlite3.connect(path or db_path())
+    db.executescript(SCHEMA)
+    return db
+
+# Leading number of "3", "03/12" or "03 - Title"
+def leading_number(text):
+    match = re.match(r'\s*(\d+)', text or '')
+    return int(match.group(1)) if match else 0
+
+# Artist, album, title and number from .../Artist/Album/03 - Title.ext
+def tags_from_path(path, root):
+    parts = os.path.relpath(path, root).split(os.sep)
+    stem = os.path.splitext(parts[-1])[0]
+    number = leading_number(stem)
+    title = re.sub(r'^\s*\d+\s*[-._]?\s*', '', stem) or stem
+    album = parts[-2] if len(parts) >= 2 else UNKNOWN
+    artist = parts[-3] if len(parts) >= 3 else UNKNOWN
+    return artist, album, title, number
+
+def read_tags(path, root):
+    artist, album, title, number = tags_from_path(path, root)
+    seconds = 0
+    if mutagen is not None:
+        try:
+            audio = mutagen.File(path, easy=True)
+        except Exception:
+            audio = None
+        if audio is not None:
+            tags = audio.tags or {}
+            first = lambda key: (tags.get(key) or [''])[0].strip()
+            artist = first('albumartist') or first('artist') or artist
+            album = first('album') or album
+            title = first('title') or title
+            number = leading_number(first('tracknumber')) or number
+            seconds = int(getattr(audio.info, 'length', 0) or 0)
+    return artist, album, title, number, seconds
+
+# {path: (mtime, size)} of the songs known to be directly in directory
+def known_files(db, directory):
+    prefix = directory.rstrip(os.sep) + os.sep
+    # Every path under the directory sorts between "dir/" and "dir0"
+    rows = db.execute('SELECT path, mtime, size FROM tracks WHERE path >= ? AND path < ?',
+                      (prefix, prefix[:-1] + chr(ord(os.sep) + 1)))
+    return {row[0]: (row[1], row[2]) for row in rows if os.path.dirname(row[0]) == prefix[:-1]}
+
+def meta(db, key):
+    row = db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+    return row[0] if row else None
+
+# Brings the database in line with root; returns (added or changed, removed).
+# Only one update runs at a time; a second one returns (0, 0) right away.
+def update(root, path=None, full=False):
+    db_file = path or db_path()
+    root = root.rstrip(os.sep) or os.sep
+    with open(db_file + '.lock', 'w') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return 0, 0
+        db = connect(db_file)
+        try:
+            last_full = meta(db, 'full')
+            if (meta(db, 'root') != root or last_full is None
+                    or time.time() - float(last_full) > FULL_INTERVAL):
+                full = True
+            dirs = dict(db.execute('SELECT path, mtime FROM dirs'))
+            children = {}
+            for directory in dirs:
+                children.setdefault(os.path.dirname(directory), []).append(directory)
+            # A full rescan reads every directory, so every song is looked up
+            everything = {}
+            if full:
+                for name, mtime, size in db.execute('SELECT path, mtime, size FROM tracks'):
+                    everything.setdefault(os.path.dirname(name), {})[name] = (mtime, size)
+            changed = []
+            removed = []
+            seen_dirs = {}      # path -> mtime of every directory still there
+            stack = [root]
+            while stack:
+                directory = stack.pop()
+                try:
+                    mtime = os.stat(directory).st_mtime_ns
+                except OSError:
+                    continue
+                seen_dirs[directory] = mtime
+                if not full and dirs.get(directory) == mtime:
+                    stack.extend(children.get(directory, ()))
+                    continue
+                try:
+                    entries = os.scandir(directory)
+                except OSError:
+                    continue
+                known = everything.pop(directory, {}) if full else known_files(db, directory)
+                with entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            continue
+                        if not entry.name.lower().endswith(EXTENSIONS):
+                            continue
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        if known.pop(entry.path, None) != (st.st_mtime_ns, st.st_size):
+                            changed.append((entry.path, st.st_mtime_ns, st.st_size)
+                                           + read_tags(entry.path, root))
+                removed.extend((name,) for name in known)
+            # Songs in directories that are gone, or under a different root
+            gone = [(directory,) for directory in dirs.keys() - seen_dirs.keys()]
+            for known in everything.values():
+                removed.extend((name,) for name in known)
+            if not full:
+                for (directory,) in gone:
+                    removed.extend((name,) for name in known_files(db, directory))
+            with db:
+                db.executemany('INSERT OR REPLACE INTO tracks VALUES (?, ?, ?, ?, ?, ?, ?, ?)', changed)
+                db.executemany('DELETE FROM tracks WHERE path = ?', removed)
+                db.executemany('DELETE FROM dirs WHERE path = ?', gone)
+                db.executemany('INSERT OR REPLACE INTO dirs VALUES (?, ?)',
+                               [item for item in seen_dirs.items() if dirs.get(item[0]) != item[1]])
+                now = str(time.time())
+                db.execute("INSERT OR REPLACE INTO meta VALUES ('updated', ?)", (now,))
+                if full:
+                    db.execute("INSERT OR REPLACE INTO meta VALUES ('full', ?)", (now,))
+                db.execute("INSERT OR REPLACE INTO meta VALUES ('root', ?)", (root,))
+            return len(changed), len(removed)
+        finally:
+            db.close()
+
+##### QUERIES #####
+
+# Seconds since the last update(), or None if there never was one
+def age(db):
+    updated = meta(db, 'updated')
+    return time.time() - float(updated) if updated else None
+
+# [(artist, albums, tracks)]
+def artists(db):
+    return db.execute('SELECT artist, COUNT(DISTINCT album), COUNT(*) FROM tracks '
+                      'GROUP BY artist COLLATE NOCASE ORDER BY artist COLLATE NOCASE').fetchall()
+
+# {album: [Track]} of one artist, albums and tracks in order
+def albums(db, artist):
+    result = {}
+    for row in db.execute('SELECT path, artist, album, title, number, seconds FROM tracks '
+                          'WHERE artist = ? COLLATE NOCASE '
+                          'ORDER BY album COLLATE NOCASE, number, title COLLATE NOCASE', (artist,)):
+        track = Track(*row)
+        result.setdefault(track.album, []).append(track)
+    return result
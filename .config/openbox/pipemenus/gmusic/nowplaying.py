@@ -0,0 +1,65 @@
+# GMUSIC - NOWPLAYING
+# The song gmusicbrowser is playing, from the file its Now Playing plugin tees
+# "Title=...", "Artist=..." etc. lines into. The file is read once into a Track
+# instead of grepping it once per field, and the Track Info submenu rendered
+# from it is cached against the file's mtime and size (and the commands baked
+# into it), so an unchanged song costs one stat() per menu open.
+
+from typing import NamedTuple
+
+from gmusic import cache
+
+# Bump when the rendered submenu changes so old cache entries are not used
+MENU_VERSION = 2
+
+# h:mm:ss or m:ss
+def format_seconds(seconds):
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return '%d:%02d:%02d' % (hours, minutes, seconds)
+    return '%d:%02d' % (minutes, seconds)
+
+class Track(NamedTuple):
+    title: str = ''
+    artist: str = ''
+    album: str = ''
+    length: str = ''
+    year: str = ''
+    track: str = ''
+
+    # Length as h:mm:ss or m:ss when gmusicbrowser gave seconds
+    def runtime(self):
+        if not self.length.isdigit():
+            return self.length
+        return format_seconds(int(self.length))
+
+FIELDS = {name.capitalize(): name for name in Track._fields}
+
+# Parses Key=value lines; values may be quoted and unknown keys are ignored
+def parse(text):
+    values = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition('=')
+        field = FIELDS.get(key.strip())
+        if sep and field:
+            values[field] = value.strip().replace('"', '')
+    return Track(**values)
+
+def read_track(path):
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            return parse(f.read())
+    except OSError:
+        return Track()
+
+# The Track Info submenu for the song in path. render(track) is only called
+# when the file changed since the menu was last opened, or when context did:
+# anything else render() puts in the XML, such as the control command.
+def track_info(path, render, context=None):
+    key = [MENU_VERSION, context, cache.file_key(path)]
+    xml = cache.load('nowplaying', key)
+    if xml is None:
+        xml = render(read_track(path))
+        cache.save('nowplaying', key, xml)
+    return xml
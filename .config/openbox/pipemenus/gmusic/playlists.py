@@ -0,0 +1,94 @@
+# GMUSIC - PLAYLISTS
+# Index of the .m3u playlists in gmusicbrowser's directory: name, number of
+# tracks and total length (from #EXTINF lines) of each. The index and the
+# Playlists submenu rendered from it are cached against the directory's mtime,
+# so an unchanged directory costs one stat() per menu open. When a playlist is
+# added, removed or replaced the directory is scanned once with os.scandir and
+# only playlists whose mtime or size changed are read again.
+#
+# Editing a playlist in place does not touch the directory's mtime; tools that
+# save by writing a new file and renaming it over the old one (gmusicbrowser's
+# export does) are picked up.
+
+import os
+from typing import NamedTuple
+
+from gmusic import cache
+from gmusic.nowplaying import format_seconds
+
+EXTENSIONS = ('.m3u', '.m3u8')
+
+# Bump when the index or the rendered submenu changes
+INDEX_VERSION = 1
+MENU_VERSION = 1
+
+class Playlist(NamedTuple):
+    name: str
+    tracks: int
+    seconds: int
+
+    def title(self):
+        return self.name.rsplit('.', 1)[0]
+
+# (tracks, seconds) of one playlist; entries without #EXTINF add no time
+def read_m3u(path):
+    tracks = seconds = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith(b'#'):
+                if line.startswith(b'#EXTINF:'):
+                    length = line[8:].split(b',', 1)[0]
+                    if length.isdigit():
+                        seconds += int(length)
+                continue
+            tracks += 1
+    return tracks, seconds
+
+# {name: [mtime_ns, size, tracks, seconds]}, reusing unchanged entries of old
+def scan(directory, old=None):
+    old = old or {}
+    entries = {}
+    with os.scandir(directory) as it:
+        for entry in it:
+            if not entry.name.endswith(EXTENSIONS):
+                continue
+            try:
+                st = entry.stat()
+                known = old.get(entry.name)
+                if known and known[0] == st.st_mtime_ns and known[1] == st.st_size:
+                    entries[entry.name] = known
+                else:
+                    entries[entry.name] = [st.st_mtime_ns, st.st_size, *read_m3u(entry.path)]
+            except OSError:
+                continue
+    return entries
+
+def dir_key(directory):
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+# Sorted Playlists of directory, rescanning only when it changed
+def index(directory, key=None):
+    key = [INDEX_VERSION, directory, key if key is not None else dir_key(directory)]
+    stored_key, entries = cache.load_any('playlists')
+    if stored_key != key:
+        entries = scan(directory, entries) if key[2] is not None else {}
+        cache.save('playlists', key, entries)
+    return sorted((Playlist(name, tracks, seconds) for name, (_, _, tracks, seconds) in entries.items()),
+                  key=lambda playlist: playlist.name.lower())
+
+# The Playlists submenu for directory, rendered by render(playlists) only when
+# the directory changed since the menu was last opened
+def playlist_menu(directory, render):
+    directory_key = dir_key(directory)
+    key = [MENU_VERSION, directory, directory_key]
+    xml = cache.load('playlists-menu', key)
+    if xml is None:
+        xml = render(index(directory, directory_key))
+        cache.save('playlists-menu', key, xml)
+    return xml
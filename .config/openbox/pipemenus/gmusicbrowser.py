@@ -13,6 +13,8 @@
 # with this program. If not, see: http://www.gnu.org/licenses
 #
 # Copy this file somewhere on your path and make it executable.
+# Keep pipemenu.py, gmusic-ctl.py, gmusic-index.py and the gmusic directory from the same
+# directory next to it.
 # Add the following line somewhere to your /.config/openbox/menu.xml
 #       <menu execute="/PATH/TO/gmusicbrowser.sh" id="gmusicbrowser" label="gmusicbrowser"/>
 # Be sure to change the PATH/TO to the correct path to this file.
@@ -21,77 +23,148 @@
 #
 # REQUIRES the gmusicbrowser music player to be installed on your computer.
 
-# The playlist submenu is designed to pull all .m3u files from the ~home/$USER/.config/gmusicbrowser/ directory.
+# The playlist submenu is designed to pull all .m3u/.m3u8 files from the ~home/$USER/.config/gmusicbrowser/ directory.
 # Therefore, you must create this folder and export your playlists to this folder.
 # To enable song information to display, you must enable the NOW PLAYHING plugin in gmusicbrowser.
 # Add this to "command for when playing song changed": tee /home/$USER/.config/gmusicbrowser/nowplaying.info
 # Change $USER to your actual username. Tick the checkbox for send title/artist/album in standard input.
 # You also should go to Preferences > Misc. and tick the checkbox for remember playing position between sessions.
 # This allows gmusicbrowser to remember the song it was playing within the playlist upon exit.
+# The song info is read in process from nowplaying.info and the Track Info submenu is cached
+# until that file changes, so opening the menu does not start any other programs.
+# Start gmusicd.py from your openbox autostart and the player items reach gmusicbrowser
+# over one kept-open DBus connection instead of starting `gmusicbrowser -cmd` per click.
+# Playlists are indexed (track count and length) and the submenu is cached until a playlist is
+# added, removed or re-exported; more than 40 are split into one submenu per letter.
+# The Library submenu browses Artist > Album > Track from an index of musicDir that is
+# refreshed in the background (see gmusic-index.py).
 
 # SETTING
 
-import subprocess
 import os
+import shlex
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+import pipemenu
+from gmusic import control, library, nowplaying, playlists
 
 playlistDir = '/home/derek/.config/gmusicbrowser/'
+infoFile = playlistDir + 'nowplaying.info'
+musicDir = '/home/derek/Music/'
 
-cmd1 = "cat /home/derek/.config/gmusicbrowser/*.info | sed -n -e 's/^.*Title=//p' | tr -d '\"'"
-process = subprocess.Popen(cmd1, stdout=subprocess.PIPE, shell=True)
-songTitle = process.communicate()[0].decode("utf-8").rstrip()
+# Seconds before the library index is refreshed in the background
+libraryMaxAge = 3600
 
-cmd2 = "cat /home/derek/.config/gmusicbrowser/*.info | sed -n -e 's/^.*Artist=//p' | tr -d '\"'"
-process = subprocess.Popen(cmd2, stdout=subprocess.PIPE, shell=True)
-songArtist = process.communicate()[0].decode("utf-8").rstrip()
+scriptDir = os.path.dirname(os.path.realpath(__file__))
+menuCmd = shlex.quote(os.path.realpath(__file__))
 
-cmd3 = "cat /home/derek/.config/gmusicbrowser/*.info | sed -n -e 's/^.*Album=//p' | tr -d '\"'"
-process = subprocess.Popen(cmd3, stdout=subprocess.PIPE, shell=True)
-songAlbum = process.communicate()[0].decode("utf-8").rstrip()
+# Player commands go to gmusicd.py through socat when both are there, through
+# gmusic-ctl.py otherwise (see gmusic/control.py)
+controlCmd = control.menu_command(os.path.join(scriptDir, 'gmusic-ctl.py'))
 
-cmd4 = "cat /home/derek/.config/gmusicbrowser/*.info | sed -n -e 's/^.*Length=//p' | tr -d '\"'"
-process = subprocess.Popen(cmd4, stdout=subprocess.PIPE, shell=True)
-songLength = process.communicate()[0].decode("utf-8").rstrip()
+# OPENBOX PIPEMENU
 
-cmd5 = "cat /home/derek/.config/gmusicbrowser/*.info | sed -n -e 's/^.*Year=//p' | tr -d '\"'"
-process = subprocess.Popen(cmd5, stdout=subprocess.PIPE, shell=True)
-songYear = process.communicate()[0].decode("utf-8").rstrip()
+# Only called when the song changed since the menu was last opened
+def render_track_info(song):
+	sub = pipemenu.Document()
+	with sub.menu('root-menu-325671', 'Track Info'):
+		sub.item(song.title+' - '+song.artist+' - '+song.album+' ('+song.year+')', execute=controlCmd+' PlayPause')
+		sub.item('Total Runtime: '+song.runtime(), execute=controlCmd+' PlayPause')
+		sub.separator()
+		sub.item('Open gmusicbrowser', execute='gmusicbrowser -cmd')
+	return sub.body()
 
-cmd6 = "cat /home/derek/.config/gmusicbrowser/*.info | sed -n -e 's/^.*Track=//p' | tr -d '\"'"
-process = subprocess.Popen(cmd6, stdout=subprocess.PIPE, shell=True)
-songTrack = process.communicate()[0].decode("utf-8").rstrip()
+# Only called when a playlist was added, removed or replaced; big collections
+# get one submenu per letter
+def render_playlists(index):
+	sub = pipemenu.Document()
+	with sub.menu('root-menu-325676', 'Playlists ('+str(len(index))+')'):
+		for letter, runs in pipemenu.group(index, name=playlists.Playlist.title):
+			if letter is None:
+				render_playlist_items(sub, runs[0][1])
+				continue
+			with sub.menu('gmusicbrowser-playlists-'+letter, letter+' ('+str(sum(len(run) for _, run in runs))+')'):
+				for label, run in runs:
+					if label is None:
+						render_playlist_items(sub, run)
+						continue
+					with sub.menu('gmusicbrowser-playlists-'+letter+'-'+run[0].name, label):
+						render_playlist_items(sub, run)
+	return sub.body()
 
-cmd7 = "ls -l /home/derek/.config/gmusicbrowser/*m3u | wc -l | sed -n '1p'"
-process = subprocess.Popen(cmd7, stdout=subprocess.PIPE, shell=True)
-playlistNum = process.communicate()[0].decode("utf-8").rstrip()
+def render_playlist_items(sub, members):
+	for playlist in members:
+		label = playlist.title()+'  ('+str(playlist.tracks)+' tracks'
+		if playlist.seconds:
+			label += ', '+playlists.format_seconds(playlist.seconds)
+		sub.item(label+')', execute='gmusicbrowser '+shlex.quote(playlistDir+playlist.name))
 
-# OPENBOX PIPEMENU
+# Library: artists by letter; each artist is its own pipemenu (gmusicbrowser.py
+# artist NAME) with a submenu per album, so only the opened artist is queried
+def render_library(db):
+	sub = pipemenu.Document()
+	rows = library.artists(db)
+	if not rows:
+		sub.item('Indexing '+musicDir+' ...')
+	for letter, runs in pipemenu.group(rows, name=lambda row: row[0]):
+		if letter is None:
+			render_artist_items(sub, runs[0][1])
+			continue
+		with sub.menu('gmusicbrowser-library-'+letter, letter):
+			for label, run in runs:
+				if label is None:
+					render_artist_items(sub, run)
+					continue
+				with sub.menu('gmusicbrowser-library-'+letter+'-'+run[0][0], label):
+					render_artist_items(sub, run)
+	return sub
+
+def render_artist_items(sub, rows):
+	for artist, albums, tracks in rows:
+		sub.menu('gmusicbrowser-artist-'+artist, artist+' ('+str(albums)+')', execute=menuCmd+' artist '+shlex.quote(artist))
+
+def render_artist(db, artist):
+	sub = pipemenu.Document()
+	for album, tracks in library.albums(db, artist).items():
+		with sub.menu('gmusicbrowser-album-'+artist+'-'+album, album+' ('+str(len(tracks))+')'):
+			sub.item('Play album', execute='gmusicbrowser '+' '.join(shlex.quote(track.path) for track in tracks))
+			sub.separator()
+			for track in tracks:
+				label = (str(track.number)+'. ' if track.number else '')+track.title
+				if track.seconds:
+					label += '  ('+nowplaying.format_seconds(track.seconds)+')'
+				sub.item(label, execute='gmusicbrowser '+shlex.quote(track.path))
+	return sub
+
+if sys.argv[1:2] in (['library'], ['artist']):
+	db = library.connect()
+	age = library.age(db)
+	if age is None or age > libraryMaxAge:
+		subprocess.Popen([sys.executable, os.path.join(scriptDir, 'gmusic-index.py'), musicDir],
+		                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+	if sys.argv[1] == 'library':
+		render_library(db).write()
+	else:
+		render_artist(db, sys.argv[2] if len(sys.argv) > 2 else '').write()
+	sys.exit()
 
-print ('<?xml version=\"1.0\" encoding=\"UTF-8\"?>')
-print ('<openbox_pipe_menu>')
-print ('<menu id=\"root-menu-325671\" label=\"Track Info\">')
-print ('<item label="'+songTitle+' - '+songArtist+' - '+songAlbum+' ('+songYear+')'+'"><action name=\"Execute\"><execute>gmusicbrowser -cmd PlayPause</execute></action></item>')
-print ('<item label="'+'Total Runtime: '+songLength+'"><action name=\"Execute\"><execute>gmusicbrowser -cmd PlayPause</execute></action></item>')
-print ('<separator/>')
-print ('<item label=\"Open gmusicbrowser\"><action name=\"Execute\"><execute>gmusicbrowser -cmd</execute></action></item>')
-print ('</menu>')
-print ('<menu id=\"root-menu-325676\" label=\"Playlists ('+playlistNum+')\">')
-for filename in os.listdir('/home/derek/.config/gmusicbrowser/'):
-	plist = "echo "+filename+" | rev | cut -d\"/\" -f1 | rev"
-	process = subprocess.Popen(plist, stdout=subprocess.PIPE, shell=True)
-	playlist = process.communicate()[0].decode("utf-8").rstrip()
-	if playlist.endswith(".m3u"):
-		print ('<item label="'+playlist+'"><action name=\"Execute\"><execute>gmusicbrowser '+playlistDir+filename+'</execute></action></item>')
-print ('</menu>')
-print ('<separator/>')
-print ('<item label=\"Play\"><action name=\"Execute\"><execute>gmusicbrowser -cmd Play</execute></action></item>')
-print ('<item label=\"Pause\"><action name=\"Execute\"><execute>gmusicbrowser -cmd Pause</execute></action></item>')
-print ('<item label=\"Stop\"><action name=\"Execute\"><execute>gmusicbrowser -cmd Stop</execute></action></item>')
-print ('<item label=\"Next\"><action name=\"Execute\"><execute>gmusicbrowser -cmd NextSong</execute></action></item>')
-print ('<item label=\"Previous\"><action name=\"Execute\"><execute>gmusicbrowser -cmd PrevSong</execute></action></item>')
-print ('<separator/>')
-print ('<item label=\"Volume Up\"><action name=\"Execute\"><execute>gmusicbrowser -cmd IncVolume</execute></action></item>')
-print ('<item label=\"Volume Down\"><action name=\"Execute\"><execute>gmusicbrowser -cmd DecVolume</execute></action></item>')
-print ('<separator/>')
-print ('<item label=\"Show/Hide\"><action name=\"Execute\"><execute>gmusicbrowser -cmd ShowHide</execute></action></item>')
-print ('<item label=\"Quit\"><action name=\"Execute\"><execute>gmusicbrowser -cmd Quit</execute></action></item>')
-print ('</openbox_pipe_menu>')
+doc = pipemenu.Document()
+doc.insert(nowplaying.track_info(infoFile, render_track_info, controlCmd))
+doc.insert(playlists.playlist_menu(playlistDir, render_playlists))
+doc.menu('gmusicbrowser-library', 'Library', execute=menuCmd+' library')
+doc.separator()
+doc.item('Play', execute=controlCmd+' Play')
+doc.item('Pause', execute=controlCmd+' Pause')
+doc.item('Stop', execute=controlCmd+' Stop')
+doc.item('Next', execute=controlCmd+' NextSong')
+doc.item('Previous', execute=controlCmd+' PrevSong')
+doc.separator()
+doc.item('Volume Up', execute=controlCmd+' IncVolume')
+doc.item('Volume Down', execute=controlCmd+' DecVolume')
+doc.separator()
+doc.item('Show/Hide', execute=controlCmd+' ShowHide')
+doc.item('Quit', execute=controlCmd+' Quit')
+doc.write()
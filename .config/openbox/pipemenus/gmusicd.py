@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+#
+# GMUSICD
+# Optional companion daemon for the gmusicbrowser pipemenu. It keeps one connection
+# to the running gmusicbrowser (over DBus when dbus-python is installed) and runs the
+# commands gmusic-ctl.py hands it, so clicking Play or Next in the menu does not
+# start a new gmusicbrowser process every time.
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of
+# the GNU General Public License version 3 as published by the Free Software Foundation.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see: http://www.gnu.org/licenses
+#
+# Start it from your ~/.config/openbox/autostart:
+#       ~/.config/openbox/pipemenus/gmusicd.py &
+# The socket lives in $XDG_RUNTIME_DIR (or /tmp) as gmusic-<uid>.sock.
+# gmusicbrowser's DBus plugin needs perl-net-dbus.
+
+# SETTINGS
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+from gmusic import control
+
+# DAEMON
+
+if __name__ == '__main__':
+    try:
+        control.Server(control.default_player()).serve_forever()
+    except KeyboardInterrupt:
+        pass
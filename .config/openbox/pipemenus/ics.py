@@ -0,0 +1,239 @@
+# ICS
+# Events from an iCalendar (.ics) file for the date-menu pipemenu. Parsing a
+# calendar exported from Thunderbird or Google can take a while, so the parsed
+# events are cached in $XDG_CACHE_HOME/date-menu, keyed by the file's mtime and
+# size; as long as the file is unchanged an open only reads the cache. The cache
+# is written with marshal rather than json: it is builtin, where importing json
+# takes longer than the rest of the menu together.
+#
+# Start times are kept as written, with their TZID ("UTC" for "Z", none for
+# floating times). Recurrences are expanded in the event's own zone, so a 09:30
+# Europe/Berlin meeting stays at 09:30 Berlin time across daylight saving
+# changes, and only each occurrence is converted to local time. All-day events
+# keep their date. Recurring events support RRULE
+# FREQ=DAILY/WEEKLY/MONTHLY/YEARLY with INTERVAL, COUNT and UNTIL; BYDAY and
+# friends are ignored, so an event is repeated on the weekday or date it starts.
+# As RFC 5545 says, dates that do not exist (the 31st in a 30 day month, Feb 29
+# in other years) are skipped, not moved.
+
+import datetime
+import marshal
+import os
+import zlib
+
+try:
+    import zoneinfo
+except ImportError:
+    zoneinfo = None
+
+# Bump when the cached format changes
+CACHE_VERSION = 2
+
+def cache_file(path):
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    directory = os.path.join(base, 'date-menu')
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, 'events-%08x.marshal' % zlib.crc32(os.path.realpath(path).encode()))
+
+# Content lines with folded continuation lines joined back up
+def unfold(text):
+    lines = []
+    for line in text.splitlines():
+        if line[:1] in (' ', '\t') and lines:
+            lines[-1] += line[1:]
+        elif line:
+            lines.append(line)
+    return lines
+
+def unescape(value):
+    return (value.replace('\\n', '\n').replace('\\N', '\n').replace('\\,', ',')
+            .replace('\\;', ';').replace('\\\\', '\\'))
+
+# ('NAME', {'PARAM': 'value'}, 'value') for one content line
+def split_line(line):
+    head, _, value = line.partition(':')
+    name, *params = head.split(';')
+    return name.upper(), dict(param.partition('=')[::2] for param in params), value
+
+def zone(tzid):
+    if tzid and zoneinfo is not None:
+        try:
+            return zoneinfo.ZoneInfo(tzid.strip('"'))
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError, OSError):
+            pass
+    return None
+
+# ([y, m, d, H, M, S], zone name, False) for a date-time, with 'UTC' for "Z"
+# and None for floating times; ('YYYY-MM-DD', None, True) for a date
+def parse_time(value, params):
+    value = value.strip()
+    if params.get('VALUE') == 'DATE' or len(value) == 8:
+        return '%s-%s-%s' % (value[:4], value[4:6], value[6:8]), None, True
+    if len(value) < 15 or value[8] != 'T':
+        raise ValueError('bad date-time: ' + value)
+    fields = [int(value[:4]), int(value[4:6]), int(value[6:8]),
+              int(value[9:11]), int(value[11:13]), int(value[13:15])]
+    datetime.datetime(*fields)
+    if value.endswith('Z'):
+        return fields, 'UTC', False
+    tzid = params.get('TZID')
+    return fields, tzid.strip('"') if tzid else None, False
+
+# {freq, interval, count, until}; ValueError for a rule that cannot be used
+def parse_rrule(value):
+    rule = dict(part.partition('=')[::2] for part in value.split(';') if part)
+    parsed = {'freq': rule.get('FREQ', '').upper(), 'interval': int(rule.get('INTERVAL') or 1)}
+    if parsed['interval'] < 1:
+        raise ValueError('RRULE INTERVAL must be positive: %r' % value)
+    if rule.get('COUNT'):
+        parsed['count'] = int(rule['COUNT'])
+    if rule.get('UNTIL'):
+        parsed['until'] = list(parse_time(rule['UNTIL'], {}))
+    return parsed
+
+# [{'summary', 'location', 'start', 'tz', 'at', 'allDay', 'rrule'}] for every
+# VEVENT; 'at' is the first start as a timestamp, for events that do not repeat
+def parse(text):
+    events = []
+    event = None
+    for line in unfold(text):
+        name, params, value = split_line(line)
+        if name == 'BEGIN' and value.upper() == 'VEVENT':
+            event = {'summary': '', 'location': '', 'start': None, 'tz': None, 'at': None, 'allDay': False,
+                     'rrule': None}
+        elif name == 'END' and value.upper() == 'VEVENT':
+            if event is not None and event['start'] is not None:
+                events.append(event)
+            event = None
+        elif event is None:
+            continue
+        elif name == 'SUMMARY':
+            event['summary'] = unescape(value)
+        elif name == 'LOCATION':
+            event['location'] = unescape(value)
+        elif name == 'DTSTART':
+            try:
+                event['start'], event['tz'], event['allDay'] = parse_time(value, params)
+                if not event['allDay']:
+                    event['at'] = in_zone(event['start'], event['tz'], False).timestamp()
+            except ValueError:
+                event = None
+        elif name == 'RRULE':
+            # One broken rule drops its event, not the whole calendar
+            try:
+                event['rrule'] = parse_rrule(value)
+            except ValueError:
+                event = None
+    return events
+
+# Parsed events of the file at path, from the cache while the file is unchanged
+def load(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return []
+    key = [CACHE_VERSION, st.st_mtime_ns, st.st_size]
+    cached = cache_file(path)
+    try:
+        with open(cached, 'rb') as f:
+            entry = marshal.loads(f.read())
+        if entry['key'] == key:
+            return entry['events']
+    except (OSError, ValueError, EOFError, TypeError, KeyError):
+        pass
+    with open(path, encoding='utf-8', errors='replace') as f:
+        events = parse(f.read())
+    try:
+        with open(cached + '.tmp', 'wb') as f:
+            f.write(marshal.dumps({'key': key, 'events': events}))
+        os.replace(cached + '.tmp', cached)
+    except OSError:
+        pass
+    return events
+
+# A start as parsed, as a datetime in its own zone: naive for dates (midnight)
+# and floating times, which are local anyway
+def in_zone(start, tz, all_day):
+    if all_day:
+        return datetime.datetime(int(start[:4]), int(start[5:7]), int(start[8:10]))
+    moment = datetime.datetime(*start)
+    if tz == 'UTC':
+        return moment.replace(tzinfo=datetime.timezone.utc)
+    tzinfo = zone(tz)
+    return moment.replace(tzinfo=tzinfo) if tzinfo else moment
+
+# A datetime from in_zone as naive local time
+def local(moment):
+    return moment.astimezone().replace(tzinfo=None) if moment.tzinfo else moment
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+
+# The start moved on by steps days/weeks/months/years, in wall clock time of
+# its zone. Counted from the first start each time, so an event on the 31st is
+# back on the 31st after a short month; None when that date does not exist.
+def shift(start, freq, steps):
+    if freq == 'DAILY':
+        return start + datetime.timedelta(days=steps)
+    if freq == 'WEEKLY':
+        return start + datetime.timedelta(weeks=steps)
+    year, month = divmod(start.month - 1 + steps * (12 if freq == 'YEARLY' else 1), 12)
+    try:
+        return start.replace(year=start.year + year, month=month + 1)
+    except ValueError:
+        return None
+
+# [(local start, all day, summary, location)] of occurrences from now until
+# days ahead, in order
+def upcoming(events, days=14, now=None):
+    now = now or datetime.datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    end = today + datetime.timedelta(days=days)
+    found = []
+    for event in events:
+        # All-day events count for the whole of their day
+        since = today if event['allDay'] else now
+        rule = event['rrule']
+        if not rule or rule['freq'] not in FREQUENCIES:
+            if event['allDay']:
+                start = in_zone(event['start'], None, True)
+            else:
+                start = datetime.datetime.fromtimestamp(event['at'])
+            if since <= start < end:
+                found.append((start, event['allDay'], event['summary'], event['location']))
+            continue
+        start = in_zone(event['start'], event['tz'], event['allDay'])
+        freq, interval = rule['freq'], rule['interval']
+        until = rule.get('until')
+        if until is not None:
+            until = local(in_zone(*until))
+        # Skip the occurrences before today instead of stepping through years
+        # of a long running event. With COUNT, monthly and yearly events are
+        # stepped from the start, as skipped dates do not count.
+        n = 0
+        first = local(start)
+        if first < today:
+            if freq in ('DAILY', 'WEEKLY'):
+                n = max((today - first).days // (interval * (7 if freq == 'WEEKLY' else 1)) - 1, 0)
+            elif 'count' not in rule:
+                months = (today.year - first.year) * 12 + today.month - first.month
+                n = max(months // (interval * (12 if freq == 'YEARLY' else 1)) - 1, 0)
+        occurred = n
+        missed = 0
+        while 'count' not in rule or occurred < rule['count']:
+            moment = shift(start, freq, n * interval)
+            n += 1
+            if moment is None:
+                # Feb 29 every 100 years, say, would otherwise never end
+                missed += 1
+                if missed > 100:
+                    break
+                continue
+            missed = 0
+            occurred += 1
+            moment = local(moment)
+            if moment >= end or (until is not None and moment > until):
+                break
+            if moment >= since:
+                found.append((moment, event['allDay'], event['summary'], event['location']))
+    found.sort(key=lambda occurrence: occurrence[0])
+    return found
@@ -0,0 +1,147 @@
+# PIPEMENU
+# Builds an <openbox_pipe_menu> document for the pipemenu scripts in this
+# directory. Every label and command is escaped, so a song title, hostname or
+# process name containing &, < or " can no longer break the XML and make
+# openbox drop the whole menu. The document is collected in a list and sent to
+# stdout in one write once it is complete.
+#
+# Escaping each string as it was added made a big menu slower to write than
+# the print() calls it replaced. The list now alternates markup and the
+# labels and commands that go between it, still unescaped; render() checks
+# all of them at once and, when any has a character to escape, escapes them
+# all in one pass over a single joined string.
+#
+#       doc = pipemenu.Document()
+#       doc.header('PLAYER')
+#       doc.item('Play', execute='gmusicbrowser -cmd Play')
+#       with doc.menu('player-playlists', 'Playlists'):
+#           doc.item('Rock', execute='gmusicbrowser ~/rock.m3u')
+#       doc.menu('player-library', 'Library', execute='gmusicbrowser.py library')
+#       doc.write()
+#
+# A menu given execute= is a pipemenu of its own: openbox runs the command only
+# when the submenu is opened, so big submenus cost nothing until then.
+
+import sys
+
+# Escapes text for a double quoted attribute or element content
+def attr(text):
+    return str(text).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+
+# An <action>, e.g. action('Execute', execute='pcmanfm') or action('Reconfigure')
+def action(name, **options):
+    return '<action name="' + attr(name) + '">' + ''.join(
+        '<' + key + '>' + attr(value) + '</' + key + '>' for key, value in options.items()) + '</action>'
+
+# Splits a sorted list for menus that fit on screen (openbox menus do not
+# scroll): [(letter, [(label, items)])]. Up to limit items stay in a single
+# group without a letter. Otherwise there is one group per first letter of
+# name(item), and a letter with more than limit items is cut into runs labelled
+# with their first and last names.
+def group(items, limit=40, name=str):
+    if len(items) <= limit:
+        return [(None, [(None, items)])]
+    letters = {}
+    for item in items:
+        first = name(item)[:1].upper()
+        letters.setdefault(first if first.isalpha() else '#', []).append(item)
+    groups = []
+    for letter in sorted(letters, key=lambda letter: (letter != '#', letter)):
+        members = letters[letter]
+        if len(members) <= limit:
+            groups.append((letter, [(None, members)]))
+            continue
+        runs = [members[start:start + limit] for start in range(0, len(members), limit)]
+        groups.append((letter, [('%s - %s' % (name(run[0])[:20], name(run[-1])[:20]), run) for run in runs]))
+    return groups
+
+class Document:
+    def __init__(self):
+        # Markup at even indexes, unescaped text at odd ones
+        self.parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<openbox_pipe_menu>\n', '']
+
+    # A menu entry; clicking it runs the given actions, or the execute command
+    def item(self, label, *actions, execute=None):
+        if actions:
+            if execute is not None:
+                actions += (action('Execute', execute=execute),)
+            self.parts += '<item label="', label, '">' + ''.join(actions) + '</item>\n', ''
+        elif execute is not None:
+            self.parts += ('<item label="', label, '"><action name="Execute"><execute>', execute,
+                           '</execute></action></item>\n', '')
+        else:
+            self.parts += '<item label="', label, '"/>\n', ''
+
+    # Many entries without actions at once
+    def items(self, labels):
+        for label in labels:
+            self.parts += '<item label="', label, '"/>\n', ''
+
+    def separator(self, label=None):
+        if label is None:
+            self.parts += '<separator/>\n', ''
+        else:
+            self.parts += '<separator label="', label, '"/>\n', ''
+
+    # A section title between two separators, as the sysinfo and date menus use
+    def header(self, label):
+        self.separator()
+        self.item(label)
+        self.separator()
+
+    # With execute= a submenu filled by running that command when it is opened.
+    # Otherwise a context manager; entries added inside the with block go into
+    # the submenu.
+    def menu(self, id, label, execute=None):
+        if execute is not None:
+            self.parts += '<menu id="', id, '" label="', label, '" execute="', execute, '"/>\n', ''
+            return None
+        return Submenu(self, id, label)
+
+    # The entries added so far without the declaration and root element, e.g.
+    # to cache a submenu and insert() it into a later document
+    def body(self):
+        return self.fill(self.parts[2:])
+
+    # Markup that is already escaped, such as a body()
+    def insert(self, xml):
+        self.parts += xml, ''
+
+    def render(self):
+        return self.fill(self.parts) + '</openbox_pipe_menu>\n'
+
+    # The parts joined, with every text escaped
+    @staticmethod
+    def fill(parts):
+        texts = parts[1::2]
+        try:
+            joined = '\0'.join(texts)
+        except TypeError:       # a number for a label
+            texts = [str(text) for text in texts]
+            joined = '\0'.join(texts)
+        if '&' in joined or '<' in joined or '>' in joined or '"' in joined:
+            texts = attr(joined).split('\0')
+            if len(texts) != len(parts) // 2:      # a text had a NUL of its own
+                texts = [attr(text) for text in parts[1::2]]
+        parts = parts[:]
+        parts[1::2] = texts
+        return ''.join(parts)
+
+    # Sends the finished document to stdout in one write
+    def write(self, stream=None):
+        stream = stream if stream is not None else sys.stdout.buffer
+        stream.write(self.render().encode('utf-8'))
+        stream.flush()
+
+class Submenu:
+    def __init__(self, doc, id, label):
+        self.doc = doc
+        self.id = id
+        self.label = label
+
+    def __enter__(self):
+        self.doc.parts += '<menu id="', self.id, '" label="', self.label, '">\n', ''
+        return self.doc
+
+    def __exit__(self, *exc):
+        self.doc.parts += '</menu>\n', ''
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+#
+# SYSINFOD
+# Optional companion daemon for sysinfo.py. It samples the system every few seconds,
+# keeps the values that never change (user, host, kernel, CPU model and cache) for
+# as long as it runs, and keeps a pre-rendered copy of the sysinfo pipemenu ready.
+# sysinfo.py asks it for that copy over a Unix socket and only collects by itself
+# when the daemon is not running.
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of
+# the GNU General Public License version 3 as published by the Free Software Foundation.
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without
+# even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program. If not, see: http://www.gnu.org/licenses
+#
+# Start it from your ~/.config/openbox/autostart:
+#       ~/.config/openbox/pipemenus/sysinfod.py &
+# The socket lives in $XDG_RUNTIME_DIR (or /tmp) as sysinfo-<uid>.sock.
+
+# SETTINGS
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+from sysmon import menu, service, snapshot
+
+# Seconds between samples
+interval = 2
+
+# DAEMON
+
+state = snapshot.Snapshot()
+
+# 'menu' is the whole menu, 'menu net' etc. the lazy submenus sysinfo.py asks for
+def refresh():
+    info = state.take()
+    responses = {
+        'menu': menu.render(info).encode('utf-8'),
+        'json': json.dumps(info).encode('utf-8'),
+        'ping': b'pong\n',
+    }
+    for name in menu.SECTIONS:
+        responses['menu ' + name] = menu.render(info, [name]).encode('utf-8')
+    return responses
+
+if __name__ == '__main__':
+    try:
+        service.Server(refresh, interval).serve_forever()
+    except KeyboardInterrupt:
+        pass
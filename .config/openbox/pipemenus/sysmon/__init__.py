@@ -0,0 +1,7 @@
+# SYSMON
+# Small helpers shared by the sysinfo pipemenu (and anything else that wants them)
+# for reading system information straight out of /proc and /sys without forking
+# shells, cat, grep, sed, awk or bc.
+#
+# Every reader takes an optional proc/sys root so it can be pointed at a copy of
+# those trees instead of the live system.
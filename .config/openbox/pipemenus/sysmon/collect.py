@@ -0,0 +1,154 @@
+# SYSMON - COLLECT
+# Gathers the plain values the sysinfo pipemenu displays in a single in-process
+# pass. /proc/meminfo, /proc/cpuinfo and /proc/uptime are each read once, the
+# rest comes from os.uname(). Mounts and swap areas are found by storage.py and
+# anything reported as a rate lives in its own sampler module (see net.py).
+
+import math
+import os
+import pwd
+
+PROC = '/proc'
+
+SI_UNITS = ('', 'k', 'M', 'G', 'T', 'P', 'E')
+IEC_UNITS = ('B', 'KiB', 'MiB', 'GiB', 'TiB', 'PiB')
+
+##### READERS #####
+
+def read_file(path):
+    with open(path) as f:
+        return f.read()
+
+# /proc/meminfo as {'MemTotal': kB, ...}
+def read_meminfo(proc=PROC):
+    meminfo = {}
+    for line in read_file(proc + '/meminfo').splitlines():
+        key, _, value = line.partition(':')
+        meminfo[key] = int(value.split()[0])
+    return meminfo
+
+# The fields of the first processor block in /proc/cpuinfo
+def read_cpuinfo(proc=PROC):
+    cpuinfo = {}
+    for line in read_file(proc + '/cpuinfo').splitlines():
+        if not line.strip():
+            if cpuinfo:
+                break
+            continue
+        key, _, value = line.partition(':')
+        cpuinfo.setdefault(key.strip(), value.strip())
+    return cpuinfo
+
+# Seconds since boot
+def read_uptime(proc=PROC):
+    return float(read_file(proc + '/uptime').split()[0])
+
+# Active swap areas as a list of dicts, sizes in kB
+def read_swaps(proc=PROC):
+    swaps = []
+    for line in read_file(proc + '/swaps').splitlines()[1:]:
+        fields = line.split()
+        if len(fields) < 5:
+            continue
+        swaps.append({
+            'filename': fields[0].replace('\\040', ' '),
+            'type': fields[1],
+            'size': int(fields[2]),
+            'used': int(fields[3]),
+            'priority': int(fields[4]),
+        })
+    return swaps
+
+##### FORMATTING #####
+
+# kB -> MiB with two decimals, the way `bc` with scale=2 printed it
+def mib(kb):
+    return '%.2f' % (kb / 1024)
+
+def percent(part, whole):
+    return '%.2f' % (part * 100 / whole) if whole else '0.00'
+
+# Bytes in powers of 1000, rounded up, like `df -H`
+def si_size(nbytes):
+    value = float(nbytes)
+    unit = SI_UNITS[0]
+    for unit in SI_UNITS:
+        if value < 1000 or unit == SI_UNITS[-1]:
+            break
+        value /= 1000
+    if not unit:
+        return '%d' % value
+    if value < 10 and math.ceil(value * 10) < 100:
+        return '%.1f%s' % (math.ceil(value * 10) / 10, unit)
+    return '%d%s' % (math.ceil(value), unit)
+
+# Bytes in powers of 1024 with one decimal, like ifconfig's RX/TX totals
+def iec_size(nbytes):
+    value = float(nbytes)
+    unit = IEC_UNITS[0]
+    for unit in IEC_UNITS:
+        if value < 1024 or unit == IEC_UNITS[-1]:
+            break
+        value /= 1024
+    return '%.1f %s' % (value, unit)
+
+# "2 days 3 hours 04 min", same wording the old `uptime | sed ...` chain produced
+def format_uptime(seconds):
+    days, minutes = divmod(int(seconds) // 60, 1440)
+    hours, minutes = divmod(minutes, 60)
+    parts = []
+    if days:
+        parts.append('%d day%s' % (days, '' if days == 1 else 's'))
+    if hours:
+        parts.append('%d hours %02d min' % (hours, minutes))
+    else:
+        parts.append('%d min' % minutes)
+    return ' '.join(parts)
+
+##### COLLECTOR #####
+
+# Values that cannot change while the machine is up
+def collect_static(proc=PROC, cpuinfo=None):
+    uname = os.uname()
+    cpuinfo = cpuinfo or read_cpuinfo(proc)
+    return {
+        'user': pwd.getpwuid(os.geteuid()).pw_name,
+        'host': uname.nodename,
+        'system': uname.sysname,
+        'release': uname.release,
+        'arch': uname.machine,
+        'CPUmodel': cpuinfo.get('model name', ''),
+        'CPUcache': cpuinfo.get('cache size', ''),
+    }
+
+# Values that have to be re-read every time they are shown
+def collect_dynamic(proc=PROC, cpuinfo=None):
+    cpuinfo = cpuinfo or read_cpuinfo(proc)
+    meminfo = read_meminfo(proc)
+
+    memTotal = meminfo.get('MemTotal', 0)
+    memFree = meminfo.get('MemFree', 0) + meminfo.get('Cached', 0)
+    memUsed = memTotal - memFree
+    swapTotal = meminfo.get('SwapTotal', 0)
+    swapFree = meminfo.get('SwapFree', 0)
+    swapUsed = swapTotal - swapFree
+
+    return {
+        'uptime': format_uptime(read_uptime(proc)),
+        'CPUfreq': cpuinfo.get('cpu MHz', ''),
+        'memTotal': mib(memTotal),
+        'memFree': mib(memFree),
+        'memUsed': mib(memUsed),
+        'memUsedPercent': percent(memUsed, memTotal),
+        'swapTotal': mib(swapTotal),
+        'swapFree': mib(swapFree),
+        'swapUsed': mib(swapUsed),
+        'swapUsedPercent': percent(swapUsed, swapTotal),
+    }
+
+# All plain values, keyed by the names the sysinfo menu has always used
+def collect(proc=PROC):
+    cpuinfo = read_cpuinfo(proc)
+    info = collect_static(proc, cpuinfo)
+    info.update(collect_dynamic(proc, cpuinfo))
+    return info
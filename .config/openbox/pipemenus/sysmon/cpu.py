@@ -0,0 +1,141 @@
+# SYSMON - CPU
+# Per-core utilisation from /proc/stat jiffy deltas and current/max frequency from
+# /sys/devices/system/cpu/cpu*/cpufreq. Shared by the sysinfo pipemenu and the
+# qtile bar.
+#
+# A sample is one flat array('Q') of STAT_FIELDS counters per row of /proc/stat,
+# the aggregate "cpu" row first and then one row per core, so a 128-core machine
+# costs a single ~8 KiB allocation per sample rather than a dict per core.
+# /proc/stat has no rows for offline cores, so row n is not always cpu n-1: the
+# cores are labelled, and their cpufreq directories found, by the number in
+# each row's "cpuN".
+
+import os
+import re
+from array import array
+
+from sysmon import collect
+from sysmon.sampler import Sampler
+
+SYS = '/sys'
+
+# user nice system idle iowait irq softirq steal; guest time is already in user
+STAT_FIELDS = 8
+USER, NICE, SYSTEM, IDLE, IOWAIT, IRQ, SOFTIRQ, STEAL = range(STAT_FIELDS)
+
+CPU_DIR = re.compile(r'cpu\d+$')
+
+# The cpu rows of /proc/stat flattened into one array. The number N of each
+# "cpuN" row is appended to cores when a list is given.
+def read_stat(proc=collect.PROC, cores=None):
+    values = array('Q')
+    for line in collect.read_file(proc + '/stat').splitlines():
+        if not line.startswith('cpu'):
+            break
+        tokens = line.split()
+        if cores is not None and tokens[0] != 'cpu':
+            cores.append(int(tokens[0][3:]))
+        fields = tokens[1:STAT_FIELDS + 1]
+        values.extend(map(int, fields + ['0'] * (STAT_FIELDS - len(fields))))
+    return values
+
+# {core number: cpufreq directory}, skipping cores without cpufreq support
+def cpufreq_dirs(sys_root=SYS):
+    base = sys_root + '/devices/system/cpu'
+    try:
+        names = [entry.name for entry in os.scandir(base) if CPU_DIR.match(entry.name)]
+    except OSError:
+        return {}
+    dirs = {}
+    for name in sorted(names, key=lambda name: int(name[3:])):
+        path = base + '/' + name + '/cpufreq'
+        if os.path.isdir(path):
+            dirs[int(name[3:])] = path
+    return dirs
+
+# One kHz value per cpufreq directory, 0 where the file cannot be read
+def read_freqs(dirs, filename):
+    values = array('I')
+    for path in dirs:
+        try:
+            with open(path + '/' + filename) as f:
+                values.append(int(f.read()))
+        except (OSError, ValueError):
+            values.append(0)
+    return values
+
+class CpuSampler(Sampler):
+    name = 'cpu'
+
+    def __init__(self, size=8, max_age=300, proc=collect.PROC, sys_root=SYS):
+        super().__init__(size, max_age)
+        self.proc = proc
+        self.freq_dirs = cpufreq_dirs(sys_root)
+        self.max_freqs = dict(zip(self.freq_dirs, read_freqs(self.freq_dirs.values(), 'cpuinfo_max_freq')))
+        self.cores = []     # the N of each core row in the newest sample
+
+    def read(self):
+        cores = []
+        values = read_stat(self.proc, cores)
+        self.cores = cores
+        return values
+
+    def encode(self, counters):
+        return counters.tolist()
+
+    def decode(self, data):
+        return array('Q', data)
+
+    # {core number: current frequency in kHz}
+    def freqs(self):
+        return dict(zip(self.freq_dirs, read_freqs(self.freq_dirs.values(), 'scaling_cur_freq')))
+
+    # (busy, iowait, steal) percentages over span as three array('d'), index 0
+    # being the whole machine and 1..n the cores. None without two samples or
+    # when a core went on/offline in between.
+    def usage(self, span):
+        if span is None:
+            return None
+        _, old, new = span
+        if len(old) != len(new):
+            return None
+        rows = len(new) // STAT_FIELDS
+        busy = array('d', bytes(8 * rows))
+        iowait = array('d', busy)
+        steal = array('d', busy)
+        for row in range(rows):
+            offset = row * STAT_FIELDS
+            deltas = [max(new[offset + i] - old[offset + i], 0) for i in range(STAT_FIELDS)]
+            total = sum(deltas)
+            if not total:
+                continue
+            busy[row] = 100 * (total - deltas[IDLE] - deltas[IOWAIT] - deltas[STEAL]) / total
+            iowait[row] = 100 * deltas[IOWAIT] / total
+            steal[row] = 100 * deltas[STEAL] / total
+        return busy, iowait, steal
+
+    # Whole-machine busy percentage between the last two samples, or None
+    def load_percent(self):
+        usage = self.usage(self.latest())
+        return usage[0][0] if usage else None
+
+    # Display strings for the sysinfo menu
+    def summary(self):
+        usage = self.usage(self.latest())
+        freqs = self.freqs()
+        # usage row of each online core; self.cores is the newest sample's, and
+        # usage() is None when the number of rows changed since the one before
+        rows = {core: row + 1 for row, core in enumerate(self.cores)}
+        lines = []
+        for core in sorted(rows or freqs):
+            line = ''
+            if usage and core in rows and rows[core] < len(usage[0]):
+                line += ' %5.1f%% busy' % usage[0][rows[core]]
+            if freqs.get(core):
+                line += ' @ %d/%d MHz' % (freqs[core] // 1000, self.max_freqs[core] // 1000)
+            if line:
+                lines.append('cpu%d:' % core + line)
+        load = ''
+        if usage:
+            load = '%.1f%% busy, %.1f%% iowait, %.1f%% steal' % (usage[0][0], usage[1][0], usage[2][0])
+        return {'cpuLoad': load, 'cpuCores': lines}
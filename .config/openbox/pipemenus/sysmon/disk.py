@@ -0,0 +1,97 @@
+# SYSMON - DISK
+# Disk activity from sampled /proc/diskstats counters: read/write MB/s, IOPS,
+# average request latency and utilisation for every whole disk. Used for the
+# DISK I/O section of the sysinfo menu and by brief() for a one-line bar widget.
+
+import os
+
+from sysmon import collect
+from sysmon.sampler import Sampler
+
+SYS = '/sys'
+
+SECTOR = 512
+
+# Indexes into a /proc/diskstats counter row (the fields after the device name)
+READS, READ_SECTORS, READ_MS = 0, 2, 3
+WRITES, WRITE_SECTORS, WRITE_MS = 4, 6, 7
+IO_MS = 9
+FIELDS = 11
+
+# Virtual devices that never say anything about how busy the machine is
+SKIP_PREFIXES = ('loop', 'ram', 'zram', 'fd', 'sr')
+
+# /proc/diskstats for whole disks only, as {'nvme0n1': [reads, ..., weighted_ms]}
+def read_diskstats(proc=collect.PROC, sys_root=SYS):
+    try:
+        disks = set(os.listdir(sys_root + '/block'))
+    except OSError:
+        disks = None
+    stats = {}
+    for line in collect.read_file(proc + '/diskstats').splitlines():
+        fields = line.split()
+        if len(fields) < 3 + FIELDS:
+            continue
+        name = fields[2]
+        if name.startswith(SKIP_PREFIXES) or (disks is not None and name not in disks):
+            continue
+        stats[name] = [int(value) for value in fields[3:3 + FIELDS]]
+    return stats
+
+class DiskSampler(Sampler):
+    name = 'disk'
+
+    def __init__(self, size=8, max_age=300, proc=collect.PROC, sys_root=SYS):
+        super().__init__(size, max_age)
+        self.proc = proc
+        self.sys_root = sys_root
+
+    def read(self):
+        return read_diskstats(self.proc, self.sys_root)
+
+    # Activity of device over span (see Sampler.latest/window), or None
+    def activity(self, device, span):
+        if span is None:
+            return None
+        seconds, old, new = span
+        if device not in old or device not in new:
+            return None
+        delta = [max(n - o, 0) for o, n in zip(old[device], new[device])]
+        requests = delta[READS] + delta[WRITES]
+        return {
+            'read_mbs': delta[READ_SECTORS] * SECTOR / 1e6 / seconds,
+            'write_mbs': delta[WRITE_SECTORS] * SECTOR / 1e6 / seconds,
+            'iops': requests / seconds,
+            'latency_ms': (delta[READ_MS] + delta[WRITE_MS]) / requests if requests else 0.0,
+            'util': min(delta[IO_MS] / (seconds * 10), 100.0),
+        }
+
+    def devices(self):
+        return sorted(self.history[-1][1]) if self.history else []
+
+    # Short text for a bar widget: the named device, or the busiest one
+    def brief(self, device=None):
+        latest = self.latest()
+        candidates = [device] if device else self.devices()
+        busiest = None
+        for name in candidates:
+            activity = self.activity(name, latest)
+            if activity and (busiest is None or activity['util'] > busiest[1]['util']):
+                busiest = (name, activity)
+        if busiest is None:
+            return '--'
+        name, activity = busiest
+        return '%s R %.1f W %.1f MB/s %.0f%%' % (name, activity['read_mbs'], activity['write_mbs'], activity['util'])
+
+    # Display strings for the sysinfo menu
+    def summary(self):
+        latest = self.latest()
+        lines = []
+        for name in self.devices():
+            activity = self.activity(name, latest)
+            if activity is None:
+                continue
+            lines.append('%s: R %.1f MB/s, W %.1f MB/s, %.0f IOPS, %.1f ms, %.0f%% util' % (
+                name, activity['read_mbs'], activity['write_mbs'], activity['iops'],
+                activity['latency_ms'], activity['util']))
+        return lines
@@ -0,0 +1,120 @@
+# SYSMON - MENU
+# Renders collected values as the sysinfo <openbox_pipe_menu> document. Shared by
+# sysinfo.py and the sysinfod daemon so both produce exactly the same menu.
+# Built with pipemenu.Document, so process names, hostnames and mountpoints are
+# escaped whatever they contain.
+
+import pipemenu
+
+# Each section draws its part of the menu into doc from the info dict. Only the
+# keys snapshot.NEEDS lists for a section have to be present.
+
+def render_system(doc, info):
+    doc.item('User @ Host: '+info['user']+' @ '+info['host'])
+    doc.item('Kernel: '+info['system']+' '+info['release']+' '+info['arch'])
+    doc.item('Uptime: '+info['uptime'])
+    doc.item('Load: '+info['loadAvg'])
+
+def render_cpu(doc, info):
+    doc.item('CPU: '+info['CPUmodel'])
+    doc.item('CPU FREQ: '+info['CPUfreq']+' MHz')
+    doc.item('CPU Cache: '+info['CPUcache'])
+    if info['cpuLoad']:
+        doc.item('CPU Load: '+info['cpuLoad'])
+    if info['cpuCores']:
+        with doc.menu('sysinfo-cpu-cores', 'Per core ('+str(len(info['cpuCores']))+')'):
+            doc.items(info['cpuCores'])
+
+def render_processes(doc, info):
+    doc.item(str(info['procCount'])+' processes')
+    with doc.menu('sysinfo-top-cpu', 'Top CPU'):
+        if info['topCpu'] is None:
+            doc.item('Waiting for a second sample')
+        elif info['topCpu']:
+            doc.items(info['topCpu'])
+        else:
+            doc.item('Nothing busy')
+    with doc.menu('sysinfo-top-mem', 'Top memory'):
+        doc.items(info['topRss'])
+
+def render_mem(doc, info):
+    doc.item('RAM USED: '+info['memUsed']+' MiB/'+info['memTotal']+' MiB'+' ('+info['memUsedPercent']+'%)')
+
+def render_pressure(doc, info):
+    doc.items(info['pressure'])
+    if not info['pressure']:
+        doc.item('Not supported by this kernel')
+
+def render_disks(doc, info):
+    doc.item('Root: '+info['rootPart']+' ('+info['fileSys']+')')
+    for fs in info['filesystems']:
+        doc.item(fs['mountpoint']+': '+fs['total']+' ('+fs['used']+' USED/'+fs['free']+' FREE) '+fs['device']+' ('+fs['fstype']+')')
+    for swap in info['swaps']:
+        doc.item('Swap: '+swap['device']+' ('+swap['used']+' MiB/'+swap['total']+' MiB)')
+    if not info['swaps']:
+        doc.item('Swap: none')
+
+def render_io(doc, info):
+    doc.items(info['diskIO'])
+    if not info['diskIO']:
+        doc.item('Waiting for a second sample')
+
+def render_net(doc, info):
+    for entry in info['net']:
+        doc.items(render_iface(entry))
+
+# name -> (title, renderer), in menu order; the names are what sysinfo.py takes
+# as its argument
+SECTIONS = {
+    'system': ('SYSTEM', render_system),
+    'cpu': ('CPU', render_cpu),
+    'processes': ('PROCESSES', render_processes),
+    'mem': ('MEM', render_mem),
+    'pressure': ('PRESSURE', render_pressure),
+    'disks': ('DISKS', render_disks),
+    'io': ('DISK I/O', render_io),
+    'net': ('NET', render_net),
+}
+
+# The pipemenu for one snapshot.take() result, as a single string. All sections
+# under their headers by default; a single section is rendered bare, as the
+# content of its own submenu.
+def render(info, sections=None):
+    doc = pipemenu.Document()
+    if sections is not None and len(sections) == 1:
+        SECTIONS[sections[0]][1](doc, info)
+        return doc.render()
+    for name in sections or SECTIONS:
+        title, draw = SECTIONS[name]
+        if name == 'pressure' and not info['pressure']:
+            continue
+        doc.header(title)
+        draw(doc, info)
+    return doc.render()
+
+# Top level menu with one lazy submenu per section: openbox runs `command name`
+# only when that submenu is opened, so nothing is collected up front
+def render_index(command):
+    doc = pipemenu.Document()
+    for name, (title, _) in SECTIONS.items():
+        doc.menu('sysinfo-' + name, title, execute=command + ' ' + name)
+    doc.separator()
+    doc.menu('sysinfo-all', 'Everything', execute=command + ' all')
+    return doc.render()
+
+# NET lines for one interface; rates only once two samples exist
+def render_iface(entry):
+    lines = [entry['iface']+(': '+entry['ip'] if entry['ip'] else '')]
+    if 'rx' in entry:
+        lines += [
+            '  Rates over the last '+entry['span']+' (avg over '+entry['avgSpan']+')',
+            '  RX: '+entry['rx']+' (avg '+entry['rxAvg']+'), '+entry['rxPackets']+' pkt/s, '+entry['rxTotal']+' total',
+            '  TX: '+entry['tx']+' (avg '+entry['txAvg']+'), '+entry['txPackets']+' pkt/s, '+entry['txTotal']+' total',
+            '  Errors: '+entry['errs']+'/s, Drops: '+entry['drop']+'/s',
+        ]
+    else:
+        lines += [
+            '  RX bytes: '+entry['rxTotal'],
+            '  TX bytes: '+entry['txTotal'],
+        ]
+    return lines
@@ -0,0 +1,111 @@
+# SYSMON - NET
+# Network throughput for every interface from sampled /proc/net/dev counters.
+# Reports the rate between the last two samples and the average across the ring
+# buffer for bytes, packets, errors and drops in each direction, each with the
+# time it covers. For sysinfo.py the last two samples are this opening of the
+# menu and the one before, which can be up to max_age (5 minutes) apart; older
+# samples are dropped and only totals are shown until the next opening.
+
+import fcntl
+import socket
+import struct
+
+from sysmon import collect
+from sysmon.sampler import Sampler
+
+SIOCGIFADDR = 0x8915
+
+# Indexes into a /proc/net/dev counter row
+RX_BYTES, RX_PACKETS, RX_ERRS, RX_DROP = 0, 1, 2, 3
+TX_BYTES, TX_PACKETS, TX_ERRS, TX_DROP = 8, 9, 10, 11
+
+# /proc/net/dev as {'eth0': [rx_bytes, rx_packets, ..., tx_compressed], ...}
+def read_netdev(proc=collect.PROC):
+    netdev = {}
+    for line in collect.read_file(proc + '/net/dev').splitlines()[2:]:
+        iface, _, counters = line.partition(':')
+        netdev[iface.strip()] = [int(value) for value in counters.split()]
+    return netdev
+
+# IPv4 address of iface, '' when it has none or does not exist
+def iface_addr(iface):
+    request = struct.pack('256s', iface[:15].encode())
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        try:
+            reply = fcntl.ioctl(s.fileno(), SIOCGIFADDR, request)
+        except OSError:
+            return ''
+    return socket.inet_ntoa(reply[20:24])
+
+def rate(bytes_per_second):
+    return collect.iec_size(bytes_per_second) + '/s'
+
+# How long a rate was measured over, '3 s' or '4 min'
+def duration(seconds):
+    return '%.0f s' % seconds if seconds < 90 else '%.0f min' % (seconds / 60)
+
+class NetSampler(Sampler):
+    name = 'net'
+
+    def __init__(self, size=8, max_age=300, ignore=('lo',), proc=collect.PROC):
+        super().__init__(size, max_age)
+        self.ignore = ignore
+        self.proc = proc
+
+    def read(self):
+        return {iface: counters for iface, counters in read_netdev(self.proc).items()
+                if iface not in self.ignore}
+
+    def interfaces(self):
+        return list(self.history[-1][1]) if self.history else []
+
+    # Per second figures for iface over span (see Sampler.latest/window), or None.
+    # Counters that went backwards (interface re-created) count as zero.
+    def rates(self, iface, span):
+        if span is None:
+            return None
+        seconds, old, new = span
+        if iface not in old or iface not in new:
+            return None
+        old, new = old[iface], new[iface]
+        per_second = lambda i: max(new[i] - old[i], 0) / seconds
+        return {
+            'rx': per_second(RX_BYTES),
+            'tx': per_second(TX_BYTES),
+            'rx_packets': per_second(RX_PACKETS),
+            'tx_packets': per_second(TX_PACKETS),
+            'errs': per_second(RX_ERRS) + per_second(TX_ERRS),
+            'drop': per_second(RX_DROP) + per_second(TX_DROP),
+        }
+
+    # One entry of display strings per interface for the sysinfo menu
+    def summary(self):
+        if not self.history:
+            return []
+        totals = self.history[-1][1]
+        latest, window = self.latest(), self.window()
+        entries = []
+        for iface in sorted(totals):
+            current = self.rates(iface, latest)
+            average = self.rates(iface, window)
+            entry = {
+                'iface': iface,
+                'ip': iface_addr(iface),
+                'rxTotal': collect.iec_size(totals[iface][RX_BYTES]),
+                'txTotal': collect.iec_size(totals[iface][TX_BYTES]),
+            }
+            if current and average:
+                entry.update({
+                    'rx': rate(current['rx']),
+                    'tx': rate(current['tx']),
+                    'rxAvg': rate(average['rx']),
+                    'span': duration(latest[0]),
+                    'avgSpan': duration(window[0]),
+                    'txAvg': rate(average['tx']),
+                    'rxPackets': '%.0f' % current['rx_packets'],
+                    'txPackets': '%.0f' % current['tx_packets'],
+                    'errs': '%.1f' % current['errs'],
+                    'drop': '%.1f' % current['drop'],
+                })
+            entries.append(entry)
+        return entries
@@ -0,0 +1,94 @@
+# SYSMON - PRESSURE
+# Load averages from /proc/loadavg and pressure stall information from
+# /proc/pressure/{cpu,memory,io}. Besides the kernel's avg10/avg60/avg300, the
+# share of time tasks were stalled between two samples is derived from the
+# "total" microsecond counters, so short spikes show up at the sampling rate.
+# Kernels built without PSI simply report load averages only.
+
+from sysmon import collect
+from sysmon.sampler import Sampler
+
+RESOURCES = ('cpu', 'memory', 'io')
+AVG10, AVG60, AVG300, TOTAL = range(4)
+
+# (load1, load5, load15, running, total tasks)
+def read_loadavg(proc=collect.PROC):
+    fields = collect.read_file(proc + '/loadavg').split()
+    running, _, tasks = fields[3].partition('/')
+    return (float(fields[0]), float(fields[1]), float(fields[2]), int(running), int(tasks))
+
+# {'some': [avg10, avg60, avg300, total_us], 'full': [...]} for one resource
+def read_psi(resource, proc=collect.PROC):
+    psi = {}
+    for line in collect.read_file(proc + '/pressure/' + resource).splitlines():
+        kind, *pairs = line.split()
+        values = dict(pair.split('=') for pair in pairs)
+        psi[kind] = [float(values['avg10']), float(values['avg60']),
+                     float(values['avg300']), int(values['total'])]
+    return psi
+
+class PressureSampler(Sampler):
+    name = 'pressure'
+
+    def __init__(self, size=8, max_age=300, proc=collect.PROC):
+        super().__init__(size, max_age)
+        self.proc = proc
+
+    def read(self):
+        sample = {'load': list(read_loadavg(self.proc))}
+        for resource in RESOURCES:
+            try:
+                sample[resource] = read_psi(resource, self.proc)
+            except OSError:
+                pass
+        return sample
+
+    # Percentage of time some/full tasks were stalled on resource over the
+    # last two samples, or None
+    def stall(self, resource, kind='some'):
+        latest = self.latest()
+        if latest is None:
+            return None
+        seconds, old, new = latest
+        try:
+            delta = new[resource][kind][TOTAL] - old[resource][kind][TOTAL]
+        except KeyError:
+            return None
+        return min(max(delta, 0) / (seconds * 1e4), 100.0)
+
+    # Display strings for the sysinfo menu
+    def summary(self):
+        if not self.history:
+            return {'loadAvg': '', 'pressure': []}
+        sample = self.history[-1][1]
+        load1, load5, load15, running, tasks = sample['load']
+        lines = []
+        for resource in RESOURCES:
+            for kind in ('some', 'full'):
+                if kind not in sample.get(resource, {}):
+                    continue
+                avg = sample[resource][kind]
+                stall = self.stall(resource, kind)
+                line = '%s %s: ' % (resource, kind)
+                if stall is not None:
+                    line += '%.1f%% now, ' % stall
+                line += 'avg10 %.2f, avg60 %.2f, avg300 %.2f' % (avg[AVG10], avg[AVG60], avg[AVG300])
+                lines.append(line)
+        load = '%.2f %.2f %.2f (%d/%d tasks)' % (load1, load5, load15, running, tasks)
+        return {'loadAvg': load, 'pressure': lines}
+
+    # Short text for a bar widget: 1 minute load plus the "some" stall share of
+    # each resource, falling back to avg10 until there are two samples
+    def brief(self):
+        if not self.history:
+            return '--'
+        sample = self.history[-1][1]
+        parts = ['%.2f' % sample['load'][0]]
+        for resource, label in zip(RESOURCES, ('cpu', 'mem', 'io')):
+            if resource not in sample:
+                continue
+            stall = self.stall(resource)
+            if stall is None:
+                stall = sample[resource]['some'][AVG10]
+            parts.append('%s %.0f%%' % (label, stall))
+        return '  '.join(parts)
@@ -0,0 +1,106 @@
+# SYSMON - PROCS
+# Top processes by CPU and by resident memory from a single pass over /proc.
+# Only /proc/[pid]/stat is read for each process: it already carries utime,
+# stime, start time and RSS, so statm would just double the syscalls, and it is
+# opened relative to a /proc directory fd to skip the path walk. The top N are
+# picked with heapq.nlargest instead of sorting every process.
+
+import heapq
+import os
+
+from sysmon import collect
+from sysmon.sampler import Sampler
+
+CLK_TCK = os.sysconf('SC_CLK_TCK')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+# Indexes into a sample entry
+TICKS, RSS, START, COMM = range(4)
+
+# Indexes into the fields after "pid (comm) " in /proc/[pid]/stat
+STAT_UTIME, STAT_STIME, STAT_START, STAT_RSS = 11, 12, 19, 21
+
+# {pid: (utime+stime ticks, rss pages, start time, comm)} for every process
+def read_procs(proc=collect.PROC):
+    procs = {}
+    proc_fd = os.open(proc, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        with os.scandir(proc_fd) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.isdigit():
+                    continue
+                try:
+                    fd = os.open(name + '/stat', os.O_RDONLY, dir_fd=proc_fd)
+                    try:
+                        data = os.read(fd, 1024)
+                    finally:
+                        os.close(fd)
+                except OSError:
+                    continue
+                rparen = data.rfind(b')')
+                fields = data[rparen + 2:].split()
+                if len(fields) <= STAT_RSS:
+                    continue
+                procs[int(name)] = (int(fields[STAT_UTIME]) + int(fields[STAT_STIME]),
+                                    int(fields[STAT_RSS]),
+                                    int(fields[STAT_START]),
+                                    data[data.find(b'(') + 1:rparen].decode('utf-8', 'replace'))
+    finally:
+        os.close(proc_fd)
+    return procs
+
+class ProcSampler(Sampler):
+    name = 'procs'
+
+    # Only the previous scan is needed for CPU deltas, so the ring stays at two
+    def __init__(self, top=10, size=2, max_age=300, proc=collect.PROC):
+        super().__init__(size, max_age)
+        self.top = top
+        self.proc = proc
+
+    def read(self):
+        return read_procs(self.proc)
+
+    # Names are only needed for the newest scan, so they are not stored
+    def encode(self, counters):
+        return [[pid, entry[TICKS], entry[RSS], entry[START]] for pid, entry in counters.items()]
+
+    def decode(self, data):
+        return {pid: (ticks, rss, start, '') for pid, ticks, rss, start in data}
+
+    # [(cpu percent, pid, comm)] for the busiest processes since the last scan,
+    # None before there are two scans. A pid whose start time changed is a new
+    # process and has no delta yet.
+    def top_cpu(self):
+        latest = self.latest()
+        if latest is None:
+            return None
+        seconds, old, new = latest
+        scale = 100 / (seconds * CLK_TCK)
+        def busy():
+            for pid, entry in new.items():
+                before = old.get(pid)
+                if before is not None and before[START] == entry[START]:
+                    yield ((entry[TICKS] - before[TICKS]) * scale, pid, entry[COMM])
+        return heapq.nlargest(self.top, busy())
+
+    # [(rss bytes, pid, comm)] for the processes holding the most memory
+    def top_rss(self):
+        if not self.history:
+            return []
+        procs = self.history[-1][1]
+        return heapq.nlargest(self.top, ((entry[RSS] * PAGE_SIZE, pid, entry[COMM])
+                                         for pid, entry in procs.items()))
+
+    # Display strings for the sysinfo menu
+    def summary(self):
+        top_cpu = self.top_cpu()
+        if top_cpu is not None:
+            top_cpu = ['%s (%d): %.1f%% CPU' % (comm, pid, percent)
+                       for percent, pid, comm in top_cpu if percent >= 0.05]
+        return {
+            'procCount': len(self.history[-1][1]) if self.history else 0,
+            'topCpu': top_cpu,
+            'topRss': ['%s (%d): %s' % (comm, pid, collect.iec_size(rss)) for rss, pid, comm in self.top_rss()],
+        }
@@ -0,0 +1,116 @@
+# SYSMON - SAMPLER
+# Base class for the collectors that report rates rather than totals. A sampler
+# keeps a small ring buffer of (timestamp, counters) pairs; rates come from the
+# difference between two entries.
+#
+# sysinfod keeps its samplers in memory. A one-shot sysinfo.py run has nothing to
+# diff against, so it loads the ring from a small JSON file in $XDG_RUNTIME_DIR,
+# adds one sample and writes it back. Each run writes a temporary file of its
+# own and renames it into place, so two runs at once cannot mix their writes.
+# Samples are stamped with time.monotonic(), which starts over at boot, so the
+# file also records the kernel's boot id and is ignored after a reboot.
+
+import collections
+import json
+import os
+import tempfile
+import time
+
+BOOT_ID = '/proc/sys/kernel/random/boot_id'
+
+# Changes on every boot; '' when unknown
+def boot_id():
+    try:
+        with open(BOOT_ID) as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+def state_dir():
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    path = os.path.join(runtime, 'sysmon') if runtime else '/tmp/sysmon-%d' % os.getuid()
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+class Sampler:
+    # State file name, also used as the section name
+    name = None
+
+    def __init__(self, size=8, max_age=300):
+        self.history = collections.deque(maxlen=size)
+        self.max_age = max_age
+
+    # Current counters; subclasses read their /proc or /sys file here
+    def read(self):
+        raise NotImplementedError
+
+    # Counters -> something json can store, and back again
+    def encode(self, counters):
+        return counters
+
+    def decode(self, data):
+        return data
+
+    def sample(self, now=None):
+        now = time.monotonic() if now is None else now
+        while self.history and now - self.history[0][0] > self.max_age:
+            self.history.popleft()
+        self.history.append((now, self.read()))
+
+    # Samples unless the newest sample is younger than seconds, so several
+    # readers polling the same sampler do not shrink its window to nothing
+    def sample_every(self, seconds, now=None):
+        now = time.monotonic() if now is None else now
+        if not self.history or now - self.history[-1][0] >= seconds:
+            self.sample(now)
+
+    # (seconds, older, newer) between the last two samples, or None
+    def latest(self):
+        if len(self.history) < 2:
+            return None
+        (t0, old), (t1, new) = self.history[-2], self.history[-1]
+        return (t1 - t0, old, new) if t1 > t0 else None
+
+    # (seconds, older, newer) across the whole ring buffer, or None
+    def window(self):
+        if len(self.history) < 2:
+            return None
+        (t0, old), (t1, new) = self.history[0], self.history[-1]
+        return (t1 - t0, old, new) if t1 > t0 else None
+
+    def state_file(self):
+        return os.path.join(state_dir(), self.name + '.json')
+
+    def load(self):
+        try:
+            with open(self.state_file()) as f:
+                state = json.load(f)
+            if state['boot'] != boot_id():
+                return
+            self.history.extend((t, self.decode(data)) for t, data in state['history'])
+        except (OSError, ValueError, TypeError, KeyError):
+            self.history.clear()
+
+    def save(self):
+        path = self.state_file()
+        state = {'boot': boot_id(), 'history': [(t, self.encode(counters)) for t, counters in self.history]}
+        try:
+            f = tempfile.NamedTemporaryFile('w', dir=os.path.dirname(path), prefix=self.name + '.',
+                                            suffix='.tmp', delete=False)
+        except OSError:
+            return
+        try:
+            with f:
+                json.dump(state, f, separators=(',', ':'))
+            os.replace(f.name, path)
+        except OSError:
+            try:
+                os.unlink(f.name)
+            except OSError:
+                pass
+
+    # One sample that survives between short-lived processes
+    def sample_persistent(self):
+        self.load()
+        self.sample()
+        self.save()
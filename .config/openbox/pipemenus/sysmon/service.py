@@ -0,0 +1,118 @@
+# SYSMON - SERVICE
+# The Unix socket protocol spoken between sysinfod.py and its clients.
+#
+# A client connects, sends one request name terminated by a newline and reads
+# until the daemon closes the connection. The daemon answers from responses it
+# rendered at its last sample, so a query costs one round trip and no collection.
+# Unknown requests get an empty reply. sysinfod.py answers:
+#
+#   menu            ->  the complete sysinfo <openbox_pipe_menu> document
+#   menu <section>  ->  one section's submenu (system, cpu, processes, mem,
+#                       pressure, disks, io or net, the names in
+#                       sysmon.menu.SECTIONS), as sysinfo.py SECTION prints it
+#   json            ->  the raw collected values as a JSON object
+#   ping            ->  "pong"
+#
+# Server itself is generic: it serves whatever {request: reply} dict its
+# refresh function returns, or whatever a subclass's respond() answers.
+# gmusicd.py runs one on its own socket with the player commands of
+# gmusic/control.py as its requests.
+
+import os
+import selectors
+import signal
+import socket
+import sys
+import time
+
+# How long a client waits for the daemon before collecting by itself
+QUERY_TIMEOUT = 0.25
+
+def socket_path():
+    runtime = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    return os.path.join(runtime, 'sysinfo-%d.sock' % os.getuid())
+
+##### CLIENT #####
+
+# The daemon's reply to request, or None when no daemon answered
+def query(request, path=None, timeout=QUERY_TIMEOUT):
+    chunks = []
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(timeout)
+            s.connect(path or socket_path())
+            s.sendall(request.encode() + b'\n')
+            while True:
+                chunk = s.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError:
+        return None
+    return b''.join(chunks) or None
+
+##### SERVER #####
+
+# Calls refresh() every interval seconds and serves the {request: bytes} dict it
+# returns until the next refresh. Runs in a single thread; a slow client can hold
+# up the loop for at most its socket timeout. Subclasses can answer requests
+# some other way by overriding respond().
+class Server:
+    name = 'sysinfod'
+
+    def __init__(self, refresh, interval=2.0, path=None):
+        self.refresh = refresh
+        self.interval = interval
+        self.path = path or socket_path()
+        self.responses = {}
+
+    def bind(self):
+        if os.path.exists(self.path):
+            if query('ping', self.path) is not None:
+                raise SystemExit(self.name + ' is already running on ' + self.path)
+            os.unlink(self.path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o077)
+        try:
+            listener.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        listener.listen(16)
+        listener.setblocking(False)
+        return listener
+
+    def answer(self, listener):
+        try:
+            conn, _ = listener.accept()
+        except BlockingIOError:
+            return
+        with conn:
+            conn.settimeout(QUERY_TIMEOUT)
+            try:
+                request = conn.recv(256).split(b'\n', 1)[0].decode(errors='replace').strip()
+                conn.sendall(self.respond(request))
+            except OSError:
+                pass
+
+    def respond(self, request):
+        return self.responses.get(request, b'')
+
+    def serve_forever(self):
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        listener = self.bind()
+        selector = selectors.DefaultSelector()
+        selector.register(listener, selectors.EVENT_READ)
+        next_sample = 0.0
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= next_sample:
+                    self.responses = self.refresh()
+                    next_sample = now + self.interval
+                for _ in selector.select(max(0.0, next_sample - time.monotonic())):
+                    self.answer(listener)
+        finally:
+            selector.close()
+            listener.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
@@ -0,0 +1,66 @@
+# SYSMON - SNAPSHOT
+# Puts the plain collectors and the rate samplers together into the one dict
+# sysmon.menu renders. sysinfod.py keeps a single Snapshot alive so its samplers
+# fill up in memory; sysinfo.py makes a persistent one that stores sampler state
+# between runs instead, and only takes what the opened menu section shows.
+
+from sysmon import collect, cpu, disk, net, pressure, procs, storage
+
+# What each menu section needs: samplers by name, 'static' and 'dynamic' for
+# collect.collect_static()/collect_dynamic() and 'storage' for the filesystems
+NEEDS = {
+    'system': ('static', 'dynamic', 'pressure'),
+    'cpu': ('static', 'dynamic', 'cpu'),
+    'processes': ('procs',),
+    'mem': ('dynamic',),
+    'pressure': ('pressure',),
+    'disks': ('storage',),
+    'io': ('disk',),
+    'net': ('net',),
+}
+
+class Snapshot:
+    def __init__(self, persistent=False):
+        self.persistent = persistent
+        self.static = None
+        self.samplers = {
+            'cpu': cpu.CpuSampler(),
+            'disk': disk.DiskSampler(),
+            'net': net.NetSampler(),
+            'pressure': pressure.PressureSampler(),
+            'procs': procs.ProcSampler(),
+        }
+
+    # Samples and collects what sections (names from menu.SECTIONS, all by
+    # default) need. A sampler left out keeps its state for the next time.
+    def take(self, sections=None):
+        parts = set()
+        for name in sections or NEEDS:
+            parts.update(NEEDS[name])
+        for name, sampler in self.samplers.items():
+            if name not in parts:
+                continue
+            if self.persistent:
+                sampler.sample_persistent()
+            else:
+                sampler.sample()
+        info = {}
+        if 'static' in parts:
+            if self.static is None:
+                self.static = collect.collect_static()
+            info.update(self.static)
+        if 'dynamic' in parts:
+            info.update(collect.collect_dynamic())
+        if 'storage' in parts:
+            info.update(storage.collect_storage())
+        if 'cpu' in parts:
+            info.update(self.samplers['cpu'].summary())
+        if 'pressure' in parts:
+            info.update(self.samplers['pressure'].summary())
+        if 'procs' in parts:
+            info.update(self.samplers['procs'].summary())
+        if 'disk' in parts:
+            info['diskIO'] = self.samplers['disk'].summary()
+        if 'net' in parts:
+            info['net'] = self.samplers['net'].summary()
+        return info
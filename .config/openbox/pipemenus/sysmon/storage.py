@@ -0,0 +1,114 @@
+# SYSMON - STORAGE
+# Finds the root device, every real mounted filesystem and every swap area by
+# parsing /proc/self/mountinfo and /proc/swaps once, then sizes each filesystem
+# with a single os.statvfs() call. Works the same on plain partitions, NVMe, LVM,
+# btrfs subvolumes and zram swap; nothing is hardcoded.
+
+import os
+
+from sysmon import collect
+
+SYS = '/sys'
+
+# Filesystems that are never backed by a block device but still hold real data
+DEVICELESS_FS = {'zfs', 'bcachefs'}
+
+# Network filesystems are left out: statvfs() on a dead server can hang the menu
+NETWORK_FS = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'sshfs', 'fuse.sshfs', '9p', 'ceph', 'glusterfs'}
+
+# mountinfo escapes space, tab, newline and backslash as \ooo
+def unescape(field):
+    if '\\' not in field:
+        return field
+    return field.encode().decode('unicode_escape').encode('latin-1').decode('utf-8', 'replace')
+
+# /proc/self/mountinfo as a list of dicts in mount order
+def read_mountinfo(proc=collect.PROC):
+    mounts = []
+    for line in collect.read_file(proc + '/self/mountinfo').splitlines():
+        fields, _, tail = line.partition(' - ')
+        fields, tail = fields.split(), tail.split()
+        if len(fields) < 5 or len(tail) < 2:
+            continue
+        mounts.append({
+            'dev': fields[2],
+            'root': unescape(fields[3]),
+            'mountpoint': unescape(fields[4]),
+            'fstype': tail[0],
+            'source': unescape(tail[1]),
+        })
+    return mounts
+
+# /dev name of a mount; /dev/root and friends are looked up through sysfs
+def device_name(mount, sys_root=SYS):
+    source = mount['source']
+    if source.startswith('/dev/') and source != '/dev/root':
+        return source
+    try:
+        with open(sys_root + '/dev/block/' + mount['dev'] + '/uevent') as f:
+            for line in f:
+                if line.startswith('DEVNAME='):
+                    return '/dev/' + line[8:].strip()
+    except OSError:
+        pass
+    return source
+
+def is_real(mount):
+    if mount['fstype'] in NETWORK_FS:
+        return False
+    return mount['source'].startswith('/dev/') or mount['fstype'] in DEVICELESS_FS
+
+# Real filesystems, one entry per device. Bind mounts and extra btrfs subvolumes
+# share their device's major:minor, so only the shortest mountpoint is kept.
+def real_mounts(mounts):
+    by_dev = {}
+    for mount in mounts:
+        if not is_real(mount):
+            continue
+        kept = by_dev.get(mount['dev'])
+        if kept is None or len(mount['mountpoint']) < len(kept['mountpoint']):
+            by_dev[mount['dev']] = mount
+    return sorted(by_dev.values(), key=lambda mount: mount['mountpoint'])
+
+# (total, used, free) bytes of the filesystem on path, or None
+def fs_usage(path):
+    try:
+        st = os.statvfs(path)
+    except OSError:
+        return None
+    return (st.f_blocks * st.f_frsize, (st.f_blocks - st.f_bfree) * st.f_frsize, st.f_bavail * st.f_frsize)
+
+# Root device, filesystems and swap areas as display strings for the sysinfo menu
+def collect_storage(proc=collect.PROC, sys_root=SYS):
+    mounts = read_mountinfo(proc)
+    info = {'rootPart': '', 'fileSys': '', 'diskTotal': '', 'diskUsed': '', 'diskFree': '',
+            'filesystems': [], 'swaps': []}
+
+    for mount in mounts:
+        if mount['mountpoint'] == '/':
+            info['rootPart'], info['fileSys'] = device_name(mount, sys_root), mount['fstype']
+
+    for mount in real_mounts(mounts):
+        usage = fs_usage(mount['mountpoint'])
+        if usage is None or not usage[0]:
+            continue
+        total, used, free = map(collect.si_size, usage)
+        if mount['mountpoint'] == '/':
+            info['diskTotal'], info['diskUsed'], info['diskFree'] = total, used, free
+        info['filesystems'].append({
+            'mountpoint': mount['mountpoint'],
+            'device': device_name(mount, sys_root),
+            'fstype': mount['fstype'],
+            'total': total,
+            'used': used,
+            'free': free,
+        })
+
+    for swap in collect.read_swaps(proc):
+        info['swaps'].append({
+            'device': swap['filename'],
+            'type': swap['type'],
+            'total': collect.mib(swap['size']),
+            'used': collect.mib(swap['used']),
+        })
+    return info
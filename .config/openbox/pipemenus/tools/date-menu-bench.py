@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+#
+# DATE-MENU-BENCH
+# Timing harness for the date-menu pipemenu. Writes an .ics file of N events in
+# a scratch home (a tenth of them recurring daily, weekly, monthly or yearly,
+# in a mix of timezones) and times parsing it, loading it with nothing cached
+# and from the cache, expanding the upcoming events, and whole date-menu.py
+# runs against the cold and the warm cache next to a bare interpreter start.
+#
+# Usage: date-menu-bench.py [N]
+
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, here)
+
+ZONES = ('America/New_York', 'Europe/Berlin', 'Asia/Tokyo', None)
+
+def timed(label, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    print('%-36s %8.2f ms' % (label, (time.perf_counter() - start) * 1000))
+    return result
+
+def make_events(path, count):
+    rng = random.Random(1)
+    lines = ['BEGIN:VCALENDAR']
+    for i in range(count):
+        zone = ZONES[i % len(ZONES)]
+        start = '%04d%02d%02dT%02d%02d00' % (rng.randint(2015, 2027), rng.randint(1, 12),
+                                             rng.randint(1, 28), rng.randint(0, 23), rng.choice((0, 30)))
+        lines += ['BEGIN:VEVENT', 'SUMMARY:Event %d\\, room %d' % (i, i % 40),
+                  'DTSTART;TZID=%s:%s' % (zone, start) if zone else 'DTSTART:%sZ' % start]
+        if i % 10 == 0:
+            lines.append('RRULE:FREQ=' + ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')[i // 10 % 4])
+        lines.append('END:VEVENT')
+    lines.append('END:VCALENDAR')
+    with open(path, 'w') as f:
+        f.write('\r\n'.join(lines) + '\r\n')
+
+def run_menu(runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(here, 'date-menu.py')], stdout=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    scratch = tempfile.mkdtemp(prefix='date-menu-bench-')
+    try:
+        os.environ['HOME'] = scratch
+        os.environ['XDG_CACHE_HOME'] = os.path.join(scratch, 'cache')
+        import ics
+        path = os.path.join(scratch, '.local', 'share', 'calendar', 'events.ics')
+        os.makedirs(os.path.dirname(path))
+        make_events(path, count)
+        print('%d events, %d KiB of .ics' % (count, os.path.getsize(path) // 1024))
+        with open(path) as f:
+            text = f.read()
+        timed('parse', ics.parse, text)
+        timed('load, cold', ics.load, path)
+        events = timed('load, cached', ics.load, path)
+        found = timed('upcoming 14 days', ics.upcoming, events, 14)
+        print('%d occurrences in the next 14 days' % len(found))
+        os.remove(ics.cache_file(path))
+        print('%-36s %8.2f ms' % ('date-menu.py, cold cache', run_menu(1)))
+        print('%-36s %8.2f ms' % ('date-menu.py, warm (median of 10)', run_menu(10)))
+        bare = []
+        for _ in range(10):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', 'pass'], check=True)
+            bare.append((time.perf_counter() - start) * 1000)
+        print('%-36s %8.2f ms' % ('bare interpreter (median of 10)', statistics.median(bare)))
+    finally:
+        shutil.rmtree(scratch)
+
+if __name__ == '__main__':
+    main()
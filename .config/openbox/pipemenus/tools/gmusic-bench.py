@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+#
+# GMUSIC-BENCH
+# Timing harness for the gmusicbrowser pipemenu's playlist index. Creates N
+# playlists of a few tracks each in a scratch directory, with the cache pointed
+# at a scratch directory too, and times a cold index with nothing cached, a
+# warm open of an unchanged directory, an open after one playlist was added, and
+# rendering the grouped Playlists submenu. Then does the same for the music
+# library index with 4*N songs (N/10 artists of 4 albums): a cold update, an
+# update with nothing changed, one after 10 songs changed, and the queries
+# behind the Library and artist submenus.
+#
+# Usage: gmusic-bench.py [N]
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import pipemenu
+
+def timed(label, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    print('%-36s %8.2f ms' % (label, (time.perf_counter() - start) * 1000))
+    return result
+
+def make_playlists(directory, count):
+    for i in range(count):
+        name = '%s%s Mix %05d.m3u' % (chr(65 + i % 26), chr(97 + i // 26 % 26), i)
+        with open(os.path.join(directory, name), 'w') as f:
+            f.write('#EXTM3U\n')
+            for track in range(12):
+                f.write('#EXTINF:%d,Artist - Track %d\n/music/%d/%d.flac\n' % (180 + track, track, i, track))
+
+# Same shape as gmusicbrowser.py's render_playlists
+def render(index):
+    from gmusic import playlists
+    doc = pipemenu.Document()
+    with doc.menu('playlists', 'Playlists (%d)' % len(index)):
+        for letter, runs in pipemenu.group(index, name=playlists.Playlist.title):
+            with doc.menu('playlists-%s' % letter, '%s' % letter):
+                for label, run in runs:
+                    with doc.menu('playlists-%s-%s' % (letter, run[0].name), '%s' % label):
+                        for playlist in run:
+                            doc.item(playlist.title(), execute='gmusicbrowser ' + playlist.name)
+    return doc.body()
+
+def make_music(root, count):
+    for i in range(count):
+        album = os.path.join(root, 'Artist %04d' % (i // 40), 'Album %d' % (i // 10 % 4))
+        os.makedirs(album, exist_ok=True)
+        with open(os.path.join(album, '%02d - Song %d.flac' % (i % 10 + 1, i)), 'w') as f:
+            f.write('x')
+
+def bench_library(scratch, count):
+    from gmusic import library
+    root = os.path.join(scratch, 'music')
+    make_music(root, count)
+    print('%d songs%s' % (count, '' if library.mutagen else ' (tags from paths, mutagen not installed)'))
+    timed('library update, cold', library.update, root)
+    timed('library update, nothing changed', library.update, root)
+    for i in range(10):
+        album = os.path.join(root, 'Artist %04d' % i, 'Album 0')
+        os.rename(os.path.join(album, '01 - Song %d.flac' % (i * 40)), os.path.join(album, '01 - Renamed.flac'))
+    timed('library update, 10 songs renamed', library.update, root)
+    for i in range(10):
+        os.utime(os.path.join(root, 'Artist %04d' % i, 'Album 0', '01 - Renamed.flac'), (0, i))
+    timed('library update, full, 10 songs retagged', library.update, root, None, True)
+    db = library.connect()
+    artists = timed('artists query', library.artists, db)
+    timed('one artist\'s albums query', library.albums, db, artists[len(artists) // 2][0])
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    scratch = tempfile.mkdtemp(prefix='gmusic-bench-')
+    try:
+        os.environ['XDG_CACHE_HOME'] = os.path.join(scratch, 'cache')
+        from gmusic import playlists
+        directory = os.path.join(scratch, 'playlists')
+        os.mkdir(directory)
+        make_playlists(directory, count)
+        print('%d playlists' % count)
+        index = timed('index, cold', playlists.index, directory)
+        timed('index, unchanged directory', playlists.index, directory)
+        xml = timed('render grouped submenu', render, index)
+        timed('submenu, first open', playlists.playlist_menu, directory, render)
+        timed('submenu, unchanged directory', playlists.playlist_menu, directory, render)
+        time.sleep(0.01)
+        make_playlists(directory, 1)
+        os.rename(os.path.join(directory, 'Aa Mix 00000.m3u'), os.path.join(directory, 'New.m3u'))
+        timed('submenu, one playlist added', playlists.playlist_menu, directory, render)
+        groups = pipemenu.group(index, name=playlists.Playlist.title)
+        print('%d letters, %d submenus, %d KiB of XML' % (len(groups), sum(len(runs) for _, runs in groups), len(xml) // 1024))
+        print()
+        bench_library(scratch, count * 4)
+    finally:
+        shutil.rmtree(scratch)
+
+if __name__ == '__main__':
+    main()
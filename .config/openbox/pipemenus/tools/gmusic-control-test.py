@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+#
+# GMUSIC-CONTROL-TEST
+# Exercises the gmusicbrowser control channel without gmusicbrowser. Starts the
+# gmusicd server in a child process with a stand-in player that writes every
+# command it gets (and when) to a log, in a scratch $XDG_RUNTIME_DIR. Then it
+# clicks through the menu the way openbox does, running the menu's command
+# (socat when installed, see control.menu_command()) and then gmusic-ctl.py
+# once per click, plus a burst of in-process sends. It checks that every
+# command arrived once and in order, and prints how long a click took.
+#
+# Usage: gmusic-control-test.py [CLICKS]
+#        gmusic-control-test.py --stand-in LOG    (the child)
+
+import os
+import shlex
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(here))
+
+from gmusic import control
+
+# Pretends to be gmusicbrowser: takes a moment per command, like a DBus call
+class StandInPlayer:
+    def __init__(self, log):
+        self.log = log
+
+    def run(self, command):
+        time.sleep(0.002)
+        with open(self.log, 'a') as f:
+            f.write('%f %s\n' % (time.monotonic(), command))
+
+def wait_for_daemon(path):
+    for _ in range(100):
+        if control.service.query('ping', path) == b'pong\n':
+            return
+        time.sleep(0.02)
+    raise SystemExit('stand-in daemon did not start')
+
+def played(log, count):
+    for _ in range(100):
+        try:
+            with open(log) as f:
+                commands = [line.split()[1] for line in f]
+        except OSError:
+            commands = []
+        if len(commands) >= count:
+            return commands
+        time.sleep(0.02)
+    return commands
+
+def main():
+    clicks = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    scratch = tempfile.mkdtemp(prefix='gmusic-control-')
+    os.environ['XDG_RUNTIME_DIR'] = scratch
+    log = os.path.join(scratch, 'played.log')
+    daemon = subprocess.Popen([sys.executable, os.path.realpath(__file__), '--stand-in', log])
+    try:
+        wait_for_daemon(control.socket_path())
+        ctl = os.path.join(os.path.dirname(here), 'gmusic-ctl.py')
+        sent = [('NextSong', 'PrevSong', 'PlayPause')[i % 3] for i in range(clicks)]
+        # openbox splits an execute command into arguments the way a shell would
+        menu = shlex.split(control.menu_command(ctl))
+        for label, argv in (('the menu command (%s)' % ('socat' if shutil.which('socat') else
+                                                        'no socat: gmusic-ctl.py'), menu),
+                            ('gmusic-ctl.py', [sys.executable, ctl])):
+            times = []
+            for command in sent:
+                start = time.perf_counter()
+                subprocess.run(argv + [command], check=True)
+                times.append((time.perf_counter() - start) * 1000)
+            print('%d clicks through %s: median %.1f ms, max %.1f ms per click'
+                  % (clicks, label, statistics.median(times), max(times)))
+
+        burst = ['NextSong'] * 200
+        start = time.perf_counter()
+        for command in burst:
+            assert control.send(command)
+        print('200 NextSong sent in process in %.1f ms' % ((time.perf_counter() - start) * 1000))
+
+        expected = sent + sent + burst
+        got = played(log, len(expected))
+        print('player got %d of %d commands, in order: %s' % (len(got), len(expected), got == expected))
+        assert not control.send('rm -rf'), 'unknown command accepted'
+        print('unknown commands refused: True')
+    finally:
+        daemon.terminate()
+        daemon.wait()
+        shutil.rmtree(scratch)
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--stand-in']:
+        control.Server(StandInPlayer(sys.argv[2])).serve_forever()
+    else:
+        main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+#
+# PIPEMENU-BENCH
+# Timing harness for pipemenu.py. Writes a menu of N items into a pipe, the way
+# openbox reads a pipemenu, once with the print() per line the scripts used to
+# do and once with pipemenu.Document, and reports the time taken and the number
+# of write() calls that reached the pipe. print() is measured both block
+# buffered (stdout is a pipe, what openbox sees) and line buffered (stdout is a
+# terminal, what you see when trying a script by hand). Each size is run with
+# plain labels and with labels that all need escaping, which print() skips.
+#
+# Usage: pipemenu-bench.py [N ...]
+
+import io
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import pipemenu
+
+# Labels with the characters that used to break the XML, or without any
+def labels(count, special=True):
+    if special:
+        return ['Track %d - Rock & Roll <Live> "Remastered"' % i for i in range(count)]
+    return ['Track %d - Rock and Roll (Live) Remastered' % i for i in range(count)]
+
+class CountingFile(io.FileIO):
+    writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+# Runs fn(stream) against the write end of a pipe that a thread keeps draining;
+# returns (milliseconds, write calls)
+def into_pipe(fn, line_buffering):
+    read_fd, write_fd = os.pipe()
+    drain = threading.Thread(target=lambda: [None for _ in iter(lambda: os.read(read_fd, 65536), b'')])
+    drain.start()
+    raw = CountingFile(write_fd, 'w')
+    stream = io.TextIOWrapper(io.BufferedWriter(raw), encoding='utf-8', line_buffering=line_buffering)
+    start = time.perf_counter()
+    fn(stream)
+    stream.flush()
+    elapsed = (time.perf_counter() - start) * 1000
+    writes = raw.writes
+    stream.close()
+    drain.join()
+    os.close(read_fd)
+    return elapsed, writes
+
+def legacy(items):
+    def run(stream):
+        print ('<?xml version=\"1.0\" encoding=\"UTF-8\"?>', file=stream)
+        print ('<openbox_pipe_menu>', file=stream)
+        for label in items:
+            print ('<item label="'+label+'"><action name=\"Execute\"><execute>true</execute></action></item>', file=stream)
+        print ('</openbox_pipe_menu>', file=stream)
+    return run
+
+def builder(items):
+    def run(stream):
+        doc = pipemenu.Document()
+        for label in items:
+            doc.item(label, execute='true')
+        doc.write(stream.buffer)
+    return run
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 5000, 20000]
+    runs = 15
+    print('%8s  %-8s %-24s %10s %8s' % ('items', 'labels', 'writer', 'median ms', 'writes'))
+    for size in sizes:
+        for special in (False, True):
+            items = labels(size, special)
+            for name, fn, line_buffering in (('print(), pipe', legacy(items), False),
+                                             ('print(), terminal', legacy(items), True),
+                                             ('pipemenu.Document', builder(items), False)):
+                results = [into_pipe(fn, line_buffering) for _ in range(runs)]
+                print('%8d  %-8s %-24s %10.2f %8d' % (size, '&<>"' if special else 'plain', name,
+                                                      statistics.median(ms for ms, _ in results), results[0][1]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+#
+# SYSINFO-BENCH
+# Timing harness for the sysinfo pipemenu. Runs the shell pipelines the menu used
+# to spawn (kept verbatim below) against the in-process sysmon collector, prints
+# how long each takes and the labels they produce side by side, and checks that
+# the collector never starts a child process. When sysinfod.py is running the
+# round trip to fetch its pre-rendered menu is timed as well.
+#
+# Usage: sysinfo-bench.py [RUNS]
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from sysmon import service, snapshot
+
+# The pipelines sysinfo.py ran before the collector replaced them
+LEGACY = [
+    ('user', "whoami"),
+    ('host', "uname -n"),
+    ('system', "uname -s"),
+    ('release', "uname -r"),
+    ('arch', "uname -m"),
+    ('uptime', "uptime | sed 's/.* up //' | sed 's/[0-9]* us.*//' | sed 's/ day, / day /' | sed 's/ days, / days /' | sed 's/:/ hours /' | sed 's/ min//'|  sed 's/,/ min/' | sed 's/  / /'"),
+    ('CPUmodel', "cat /proc/cpuinfo | grep 'model name' | sed 's/.*: //' | sed -n '1p'"),
+    ('CPUfreq', "cat /proc/cpuinfo | grep -m 1 'cpu MHz' | sed 's/.*: //'"),
+    ('CPUcache', "cat /proc/cpuinfo | grep -m 1 'cache size' | sed 's/.*: //'"),
+    ('memTotal', "echo 'scale = 2; ('$(cat /proc/meminfo | grep MemTotal: | awk '{print $2}' | sed 's/k//')' /1024)' | bc"),
+    ('memFree', "echo 'scale = 2; ('$(cat /proc/meminfo | grep MemFree: | awk '{print $2}' | sed 's/k//')' /1024) + ('$(cat /proc/meminfo | grep grep -m 1 Cached: | awk '{print $2}' | sed 's/k//')' /1024)' | bc"),
+    ('memUsed', "echo 'scale = 2; ('$(cat /proc/meminfo | grep MemTotal: | awk '{print $2}' | sed 's/k//')' /1024) - (('$(cat /proc/meminfo | grep MemFree: | awk '{print $2}' | sed 's/k//')' /1024) + ('$(cat /proc/meminfo | grep -m 1 Cached: | awk '{print $2}' | sed 's/k//')' /1024))' | bc"),
+    ('memUsedPercent', "echo 'scale = 2; (('$(cat /proc/meminfo | grep MemTotal: | awk '{print $2}' | sed 's/k//')' /1024) - (('$(cat /proc/meminfo | grep MemFree: | awk '{print $2}' | sed 's/k//')' /1024) + ('$(cat /proc/meminfo | grep -m 1 Cached: | awk '{print $2}' | sed 's/k//')' /1024))) / ('$(cat /proc/meminfo | grep MemTotal: | awk '{print $2}' | sed 's/k//')' /1024) *100' | bc"),
+    ('rootPart', "df -HlT | grep /dev/sda1 | sed -r 's/   / /g' | sed -r 's/  / /g' | cut -d ' '  -f 1"),
+    ('fileSys', "df -HlT | grep /dev/sda1 | sed -r 's/   / /g' | sed -r 's/  / /g' | cut -d ' '  -f 2"),
+    ('diskTotal', "df -HlT | grep /dev/sda1 | sed -r 's/   / /g' | sed -r 's/  / /g' | cut -d ' '  -f 3"),
+    ('diskUsed', "df -HlT | grep /dev/sda1 | sed -r 's/   / /g' | sed -r 's/  / /g' | cut -d ' '  -f 4"),
+    ('diskFree', "df -HlT | grep /dev/sda1 | sed -r 's/   / /g' | sed -r 's/  / /g' | cut -d ' '  -f 5"),
+    ('swapPart', "cat /proc/swaps | grep /dev/sda5 | sed -r 's/   / /g' | sed -r 's/  / /g' | cut -d ' '  -f 1"),
+    ('swapTotal', "echo 'scale = 2; ('$(cat /proc/meminfo | grep SwapTotal: | awk '{print $2}' | sed 's/k//')' /1024)' | bc"),
+    ('swapFree', "echo 'scale = 2; ('$(cat /proc/meminfo | grep SwapFree: | awk '{print $2}' | sed 's/k//')' /1024)' | bc"),
+    ('swapUsed', "echo 'scale = 2; ('$(cat /proc/meminfo | grep SwapTotal: | awk '{print $2}' | sed 's/k//')' /1024) - ('$(cat /proc/meminfo | grep SwapFree: | awk '{print $2}' | sed 's/k//')' /1024)' | bc"),
+    ('swapUsedPercent', "echo 'scale = 2; (('$(cat /proc/meminfo | grep SwapTotal: | awk '{print $2}' | sed 's/k//')' /1024) - ('$(cat /proc/meminfo | grep SwapFree: | awk '{print $2}' | sed 's/k//')' /1024)) / ('$(cat /proc/meminfo | grep SwapTotal: | awk '{print $2}' | sed 's/k//')' /1024) *100' | bc"),
+    ('netIP', "/sbin/ifconfig 'enp3s0' | grep 'inet ' | sed 's/.*inet //' | sed 's/netmask.*//'"),
+    ('netDown', "/sbin/ifconfig 'enp3s0' | grep 'RX packets' | sed 's/.*bytes [0-9]* (//'  | sed 's/iB).*)*//' | sed 's/b).*)*//' | sed 's/).*)*//'"),
+    ('netUp', "/sbin/ifconfig 'enp3s0' | grep 'TX packets' | sed 's/.*bytes [0-9]* (//'  | sed 's/iB).*)*//' | sed 's/b).*)*//' | sed 's/).*)*//'"),
+]
+
+# What a one-shot sysinfo.py run collects, minus writing sampler state
+def run_collector():
+    return snapshot.Snapshot().take()
+
+def run_legacy():
+    values = {}
+    for name, cmd in LEGACY:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, shell=True)
+        values[name] = process.communicate()[0].decode("utf-8").rstrip()
+    return values
+
+# Runs fn with process creation disabled, so any fork shows up as an error
+def without_children(fn, *args):
+    saved = (os.fork, os.posix_spawn, os.posix_spawnp, subprocess.Popen)
+    def refuse(*args, **kwargs):
+        raise AssertionError('collector tried to start a child process')
+    os.fork = os.posix_spawn = os.posix_spawnp = subprocess.Popen = refuse
+    try:
+        return fn(*args)
+    finally:
+        os.fork, os.posix_spawn, os.posix_spawnp, subprocess.Popen = saved
+
+def timed(fn, runs, *args):
+    samples = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, samples
+
+def report(name, samples):
+    print('%-10s runs=%-4d mean=%8.2f ms  median=%8.2f ms  min=%8.2f ms'
+          % (name, len(samples), statistics.mean(samples), statistics.median(samples), min(samples)))
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    old, old_samples = timed(run_legacy, runs)
+    new, new_samples = timed(without_children, runs, run_collector)
+
+    print('%-16s %-36s %s' % ('LABEL', 'PIPELINES', 'COLLECTOR'))
+    for name, _ in LEGACY:
+        print('%-16s %-36s %s' % (name, old.get(name, '')[:36], new.get(name, '')))
+    for entry in new['net']:
+        print('%-16s %-36s %s' % ('net', '', ', '.join(key + '=' + value for key, value in entry.items())))
+    print()
+    report('pipelines', old_samples)
+    report('collector', new_samples)
+    if service.query('ping') is not None:
+        _, daemon_samples = timed(service.query, runs, 'menu')
+        report('sysinfod', daemon_samples)
+    print('speedup    %.0fx, collector started 0 child processes'
+          % (statistics.median(old_samples) / statistics.median(new_samples)))
+
+if __name__ == '__main__':
+    main()
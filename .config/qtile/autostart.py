@@ -0,0 +1,202 @@
+##### AUTOSTART SUPERVISOR #####
+# The startup_once hook used to run autostart.sh with subprocess.call, so qtile
+# sat waiting for bash before it went on starting up, and whatever the script
+# launched was never looked at again: a tray applet that crashed stayed gone
+# until the next login.
+#
+# The programs are now a list of Services in the config. Supervisor.start()
+# returns right away and runs them on qtile's event loop:
+#
+#   - services start concurrently, except that a service waits for the ones in
+#     its `after` (the wallpaper after the compositor). A oneshot (nitrogen
+#     --restore) counts as done once it has exited. A daemon with a `ready`
+#     probe counts as up once the probe returns true (picom once it owns the
+#     compositing manager selection), or after ready_timeout seconds with a
+#     warning. A daemon without one counts as up as soon as it is spawned, so
+#     for it `after` only orders the launches.
+#   - a daemon that exits is started again after 1, 2, 4 ... up to 60 seconds.
+#     The delay starts over once it has stayed up for a minute; after 5 quick
+#     exits in a row it is given up on, with a warning in the log.
+#   - programs that are not installed are skipped with a warning.
+#   - how long after login each service was up is logged once all of them are,
+#     and kept in Supervisor.latency.
+#
+# Daemons have to stay in the foreground to be watched, so picom runs without
+# --daemon and xfce4-power-manager with --no-daemon.
+#
+# Run as a script it starts the services from the config outside qtile (say,
+# from a plain X session), prints the report and keeps watching until ctrl-c:
+#       python3 autostart.py
+
+import asyncio
+import os
+import shutil
+import time
+from typing import NamedTuple
+
+from libqtile.log_utils import logger
+
+class Service(NamedTuple):
+    name: str
+    command: list
+    after: tuple = ()       # services that must be up first
+    oneshot: bool = False   # runs to completion rather than staying up
+    restart: bool = True    # start it again when it exits
+    ready: object = None    # a daemon is up once ready() returns true
+
+class Supervisor:
+    def __init__(self, services, backoff=1, max_backoff=60, stable=60, max_restarts=5,
+                 ready_timeout=10, ready_poll=0.05):
+        self.services = {service.name: service for service in services}
+        self.ready_timeout = ready_timeout
+        self.ready_poll = ready_poll
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stable = stable
+        self.max_restarts = max_restarts
+        self.start_time = None
+        self.settled = {}       # name -> asyncio.Event, set once up, done or given up
+        self.latency = {}       # name -> (seconds from start() until up or done, seconds spawning)
+        self.failed = {}        # name -> why it is not running
+        self.restarts = {}      # name -> times started again
+        self.processes = {}     # name -> the running process
+        self.tasks = []
+        self.stopping = False
+        self.done = None
+
+    # Starts every service in the background; returns at once
+    def start(self):
+        loop = asyncio.get_event_loop()
+        self.start_time = time.perf_counter()
+        self.settled = {name: asyncio.Event() for name in self.services}
+        for service in self.services.values():
+            for name in service.after:
+                if name not in self.services:
+                    logger.warning("autostart: %s comes after %s, which is not a service", service.name, name)
+        self.tasks = [loop.create_task(self.run(service)) for service in self.services.values()]
+        self.tasks.append(loop.create_task(self.report_when_settled()))
+
+    # Stops restarting services; the running ones are left alone, as
+    # autostart.sh left them
+    def stop(self):
+        self.stopping = True
+        for task in self.tasks:
+            task.cancel()
+
+    async def run(self, service):
+        name = service.name
+        try:
+            for other in service.after:
+                if other in self.settled:
+                    await self.settled[other].wait()
+                    if other in self.failed:
+                        logger.warning("autostart: starting %s without %s", name, other)
+            await self.supervise(service)
+        finally:
+            self.settled[name].set()
+
+    async def supervise(self, service):
+        name = service.name
+        command = [os.path.expanduser(arg) for arg in service.command]
+        if shutil.which(command[0]) is None:
+            self.failed[name] = 'not installed'
+            logger.warning("autostart: %s is not installed", command[0])
+            return
+        quick_exits = 0
+        while not self.stopping:
+            before = time.perf_counter()
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *command, stdin=asyncio.subprocess.DEVNULL, start_new_session=True)
+            except OSError as e:
+                self.failed[name] = str(e)
+                logger.warning("autostart: could not start %s: %s", name, e)
+                return
+            started = time.perf_counter()
+            self.processes[name] = process
+            if not service.oneshot and name not in self.latency:
+                if service.ready is None or await self.wait_ready(service, process):
+                    self.latency[name] = (time.perf_counter() - self.start_time, started - before)
+                    self.settled[name].set()
+            code = await process.wait()
+            del self.processes[name]
+            if service.oneshot:
+                self.latency.setdefault(name, (time.perf_counter() - self.start_time, started - before))
+                if code:
+                    self.failed[name] = 'exit status %d' % code
+                    logger.warning("autostart: %s exited with status %d", name, code)
+                return
+            if self.stopping or not service.restart:
+                return
+            quick_exits = quick_exits + 1 if time.perf_counter() - started < self.stable else 1
+            if quick_exits > self.max_restarts:
+                self.failed[name] = 'exited %d times in a row' % quick_exits
+                logger.warning("autostart: %s keeps exiting (status %d), giving up", name, code)
+                return
+            delay = min(self.backoff * 2 ** (quick_exits - 1), self.max_backoff)
+            logger.warning("autostart: %s exited with status %d, restarting in %g s", name, code, delay)
+            await asyncio.sleep(delay)
+            self.restarts[name] = self.restarts.get(name, 0) + 1
+
+    # Polls service.ready() until it returns true or ready_timeout passes; false
+    # if the process exited first
+    async def wait_ready(self, service, process):
+        deadline = time.perf_counter() + self.ready_timeout
+        while process.returncode is None:
+            try:
+                if service.ready():
+                    return True
+            except Exception:
+                logger.exception("autostart: readiness check of %s failed", service.name)
+                return True
+            if time.perf_counter() > deadline:
+                logger.warning("autostart: %s not ready after %g s, going on without it",
+                               service.name, self.ready_timeout)
+                return True
+            await asyncio.sleep(self.ready_poll)
+        return False
+
+    async def report_when_settled(self):
+        for event in self.settled.values():
+            await event.wait()
+        self.done = time.perf_counter()
+        for line in self.lines():
+            logger.info("autostart: %s", line)
+
+    def lines(self):
+        if self.done is None:
+            lines = ['%d of %d services settled' % (sum(event.is_set() for event in self.settled.values()),
+                                                    len(self.services))]
+        else:
+            lines = ['%d services settled %.1f ms after start, %d not running'
+                     % (len(self.services), (self.done - self.start_time) * 1000, len(self.failed))]
+        for name, service in self.services.items():
+            if name in self.latency:
+                settled, spawn = self.latency[name]
+                line = '  %-20s %s after %7.1f ms (spawn %.1f ms)' % (
+                    name, 'done' if service.oneshot else 'up  ', settled * 1000, spawn * 1000)
+            else:
+                line = '  %-20s waiting' % name
+            if name in self.failed:
+                line += ', ' + self.failed[name]
+            if self.restarts.get(name):
+                line += ', restarts: %d' % self.restarts[name]
+            lines.append(line)
+        return lines
+
+if __name__ == '__main__':
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+    import config
+
+    async def main():
+        supervisor = Supervisor(config.autostart_services)
+        supervisor.start()
+        await supervisor.tasks[-1]
+        print('\n'.join(supervisor.lines()))
+        await asyncio.gather(*supervisor.tasks[:-1])
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
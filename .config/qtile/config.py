@@ -1,14 +1,29 @@
 ##### IMPORTS #####
+import time
+config_start = time.perf_counter()
 import os
-import subprocess
+import sys
 from libqtile import bar, extension, hook, layout, qtile, widget
 from libqtile.config import Click, Drag, Group, Key, KeyChord, Match, Screen
 from libqtile.lazy import lazy
 # Make sure 'qtile-extras' is installed or this config will not work.
 from qtile_extras import widget
+from qtile_extras.widget import modify
 from qtile_extras.widget.decorations import BorderDecoration
 #from qtile_extras.widget import StatusNotifier
+import autostart
+import bars
 import colors
+# The /proc samplers shared with the openbox sysinfo pipemenu.
+sys.path.append(os.path.expanduser("~/.config/openbox/pipemenus"))
+from sysmon import cpu, disk, pressure
+import controls
+import hub
+import keymap
+import rules
+import theme
+import updates
+import winops
 
 ##### VARIABLES #####
 mod = "mod4"              # Sets mod key to SUPER/WINDOWS
@@ -24,12 +39,10 @@ def add_treetab_section(layout):
     prompt = qtile.widgets_map["prompt"]
     prompt.start_input("Section name: ", layout.cmd_add_section)
 
-# A function for hide/show all the windows in a group
+# A function for hide/show all the windows in a group, laid out once at the end (see winops.py)
 @lazy.function
 def minimize_all(qtile):
-    for win in qtile.current_group.windows:
-        if hasattr(win, "toggle_minimize"):
-            win.toggle_minimize()
+    winops.toggle_minimize(qtile, qtile.current_group.windows)
            
 # A function for toggling between MAX and MONADTALL layouts
 @lazy.function
@@ -40,6 +53,19 @@ def maximize_by_switching_layout(qtile):
     elif current_layout_name == 'max':
         qtile.current_group.layout = 'monadtall'
         
+# Volume and backlight, changed in process and shown on the bars at once
+# instead of forking amixer/brightnessctl per key press (see controls.py)
+# A reload runs this file again in the same namespace; the old mixer stops
+# listening before it is replaced (see controls.py)
+if hasattr(globals().get('volume_control'), 'close'):
+    volume_control.close()
+volume_control = controls.Mixer('Master', on_change=lambda: bar_hub.refresh('volume'))
+backlight_control = controls.Backlight(on_change=lambda: bar_hub.refresh('backlight'))
+
+@hook.subscribe.shutdown
+def close_controls():
+    volume_control.close()
+
 ##### KEYBINDINGS #####       
 keys = [
     # The essentials
@@ -56,13 +82,13 @@ keys = [
     Key([mod,  "shift"], "t", lazy.spawn("thunderbird"), desc='Email Client'),
     
     # Brightness Control
-    Key([], "XF86MonBrightnessUp", lazy.spawn("brightnessctl set +10%"), desc='Increase brightness by 10%'),
-    Key([], "XF86MonBrightnessDown", lazy.spawn("brightnessctl set 10%-"), desc='Decrease brightness by 10%'),
+    Key([], "XF86MonBrightnessUp", lazy.function(lambda qtile: backlight_control.up()), desc='Increase brightness by 10%'),
+    Key([], "XF86MonBrightnessDown", lazy.function(lambda qtile: backlight_control.down()), desc='Decrease brightness by 10%'),
     
     # Audio Control & Utilities
-    Key([ctrl], "F3", lazy.spawn("amixer set Master 5%+"), desc='Increase volume'),
-    Key([ctrl], "F2", lazy.spawn("amixer set Master 5%-"), desc='Decrease volume'),
-    Key([ctrl], "F4", lazy.spawn("amixer set Master toggle"), desc='Mute volume'),
+    Key([ctrl], "F3", lazy.function(lambda qtile: volume_control.up()), desc='Increase volume'),
+    Key([ctrl], "F2", lazy.function(lambda qtile: volume_control.down()), desc='Decrease volume'),
+    Key([ctrl], "F4", lazy.function(lambda qtile: volume_control.toggle()), desc='Mute volume'),
     Key([mod],  "v",  lazy.spawn("pavucontrol"), desc='Volume Control'),
     
     # Qtile 
@@ -160,6 +186,12 @@ keys = [
         #Key([], "r", lazy.spawn("dm-radio"), desc='Listen to online radio'),
         Key([], "s", lazy.spawn("dm-websearch"), desc='Search various engines'),
         Key([], "t", lazy.spawn("dm-translate"), desc='Translate text')
+    ]),
+
+    # Colour schemes from colors.py, switched in place using the key chord SUPER+y followed by 'key'
+    KeyChord([mod], "y", [
+        Key([], "n", lazy.function(lambda qtile: themes.cycle(qtile, 1)), desc='Next colour scheme'),
+        Key([], "p", lazy.function(lambda qtile: themes.cycle(qtile, -1)), desc='Previous colour scheme')
     ])
 ]
 
@@ -201,7 +233,11 @@ for i in groups:
     )
 
 ##### COLORSCHEME #####
-colors = colors.DoomOne
+# Any scheme from colors.py. SUPER+y n/p switches schemes without a reload by
+# changing these colours in place (see theme.py); the last one picked is used
+# again after a restart.
+themes = theme.Themes(colors, default='DoomOne')
+colors = themes.palette
 
 ##### DEFAULT SETTINGS FOR ALL LAYOUTS #####
 layout_theme = {"border_width": 2,
@@ -255,24 +291,63 @@ layouts = [
     #layout.Zoomy(**layout_theme),
 ]
 
-##### DEFINES A SHORTER UPTIME OUTPUT #####
-def shorten_uptime(uptime_str):
-    parts = uptime_str.split(', ')
-    short_parts = []
-
-    for part in parts:
-        if part.endswith(' hours'):
-            short_parts.append(part.replace(' hours', 'h'))
-        elif part.endswith(' hour'):
-            short_parts.append(part.replace(' hour', 'h'))
-        elif part.endswith(' minutes'):
-            short_parts.append(part.replace(' minutes', 'm'))
-        elif part.endswith(' minute'):
-            short_parts.append(part.replace(' minute', 'm'))
-        else:
-            short_parts.append(part)  
-
-    return ', '.join(short_parts)
+##### KEYMAP CHECK #####
+# Every binding above, chords and group keys included, compiled into one
+# (modifiers, key) table per chord level (see keymap.py). Keys bound twice, or
+# both on their own and as the start of a chord, stop the config from loading
+# rather than one of them silently never running; commands shared by several
+# bindings and .when() alternatives for layouts not listed above are logged.
+# `python3 tools/keymap-check.py` prints the full report.
+key_map = keymap.check(keys, layouts)
+
+##### CPU LOAD FROM THE SHARED SYSMON SAMPLER #####
+# The hub below polls this once per second for every bar.
+cpu_sampler = cpu.CpuSampler()
+
+def cpu_load():
+    cpu_sampler.sample()
+    load = cpu_sampler.load_percent()
+    return '--' if load is None else '{:.0f}'.format(load)
+
+# Read/write throughput and utilisation of the busiest disk, for the I/O
+# widget next to DF. The hub below polls this every 2 seconds.
+disk_sampler = disk.DiskSampler()
+
+def disk_activity():
+    disk_sampler.sample()
+    return disk_sampler.brief()
+
+# 1 minute load plus the share of time tasks stalled on cpu, memory and io
+# (/proc/pressure), so contention shows before the machine grinds to a halt.
+pressure_sampler = pressure.PressureSampler()
+
+def pressure_brief():
+    pressure_sampler.sample()
+    return pressure_sampler.brief()
+
+##### SHARED SAMPLING HUB #####
+# Every metric below is computed once per interval and shown on all three
+# screens' bars, instead of each bar's widgets polling on their own (see hub.py).
+# The inline ones only read /proc or call os.*, so they run straight on qtile's
+# event loop; the rest go through its thread pool.
+bar_hub = hub.Hub()
+bar_hub.register('kernel', hub.kernel_release, 300, inline=True)
+bar_hub.register('cpu', cpu_load, 1, inline=True)
+bar_hub.register('memory', hub.memory_used, 1, inline=True)
+bar_hub.register('pressure', pressure_brief, 5, inline=True)
+bar_hub.register('uptime', hub.uptime_short, 60, inline=True)
+bar_hub.register('disk', lambda: hub.disk_free('/'), 60)
+bar_hub.register('diskio', disk_activity, 2, inline=True)
+bar_hub.register('volume', volume_control.text, 60 if volume_control.cheap else 1, inline=volume_control.cheap)
+bar_hub.register('backlight', backlight_control.text, 60, inline=True)
+bar_hub.register('battery', hub.battery_percent, 60, inline=True)
+
+# Pending pacman updates. The bar only reads updates.py's cache; checkupdates
+# runs in a worker process when the cache is half an hour old or pacman's local
+# database changed (after clicking the widget to upgrade, say), and the new
+# count is pushed to every bar as soon as the worker is done.
+update_checker = updates.UpdateChecker(ttl=1800, on_change=lambda: bar_hub.refresh('updates'))
+bar_hub.register('updates', update_checker.count, 60, inline=True)
 
 widget_defaults = dict(
     font="Ubuntu Bold",
@@ -284,15 +359,26 @@ widget_defaults = dict(
 extension_defaults = widget_defaults.copy()
 
 ##### WIDGETS #####
+# Times each widget's construction and first draw; logged once every bar has drawn.
+# False builds the widgets untouched, without timing them.
+bar_profiling = True
+bar_profile = bars.Profiler(config_start, enabled = bar_profiling)
+
+@hook.subscribe.startup_complete
+def settle_bar_profile():
+    bar_profile.settle()
+
+# The bar, declared once; bars.build() makes each screen's widgets from it.
+# Widgets with role = 'primary' are only put on the first screen.
 def init_widgets_list():
     widgets_list = [
-        widget.Spacer(length = 8),
-        widget.Image(
+        bars.spec(widget.Spacer, length = 8),
+        bars.spec(widget.Image,
                  filename = "~/.config/qtile/icons/python-white.png",
                  scale = "False",
                  mouse_callbacks = {'Button1': lambda: qtile.cmd_spawn(myTerm)},
                  ),
-        widget.GroupBox(
+        bars.spec(widget.GroupBox,
                  fontsize = 14,
                  margin_y = 3,
                  margin_x = 3,
@@ -309,33 +395,33 @@ def init_widgets_list():
                  other_current_screen_border = colors[7],
                  other_screen_border = colors[4],
                  ),
-        widget.Sep(
+        bars.spec(widget.Sep,
                  foreground = colors[1],
                  padding = 10,
                  size_percent = 50
                  ),
-        widget.CurrentLayoutIcon(
+        bars.spec(widget.CurrentLayoutIcon,
                  foreground = colors[1],
                  padding = 4,
                  scale = 0.6
                  ),
-        widget.CurrentLayout(
+        bars.spec(widget.CurrentLayout,
                  foreground = colors[1],
                  padding = 5
                  ),
-        widget.Sep(
+        bars.spec(widget.Sep,
                  foreground = colors[1],
                  padding = 8,
                  size_percent = 50
                  ),
-        widget.WindowName(
+        bars.spec(widget.WindowName,
                  foreground = colors[6],
                  padding = 3,
                  max_chars = 40
                  ),
-        widget.GenPollText(
-                 update_interval = 300,
-                 func = lambda: subprocess.check_output("printf $(uname -r)", shell=True, text=True),
+        bars.spec(modify, hub.HubText,
+                 hub = bar_hub,
+                 metric = 'kernel',
                  foreground = colors[3],
                  fmt = '󰋑   {}',
                  decorations=[
@@ -345,9 +431,11 @@ def init_widgets_list():
                      )
                  ],
                  ),
-        widget.Spacer(length = 8),
-        widget.CPU(
-                 format = '   Cpu: {load_percent}%',
+        bars.spec(widget.Spacer, length = 8),
+        bars.spec(modify, hub.HubText,
+                 hub = bar_hub,
+                 metric = 'cpu',
+                 fmt = '   Cpu: {}%',
                  foreground = colors[4],
                  decorations=[
                      BorderDecoration(
@@ -356,12 +444,12 @@ def init_widgets_list():
                      )
                  ],
                  ),
-        widget.Spacer(length = 8),
-        widget.Memory(
+        bars.spec(widget.Spacer, length = 8),
+        bars.spec(modify, hub.HubText,
+                 hub = bar_hub,
+                 metric = 'memory',
                  foreground = colors[8],
                  mouse_callbacks = {'Button1': lambda: qtile.cmd_spawn(myTerm + ' -e htop')},
-                 #format = '{MemUsed: .0f}{mm} ({MemPercent:.0f}%)',
-                 format = '{MemUsed: .0f}{mm}',
                  fmt = '🖥  Mem: {}',
                  decorations=[
                      BorderDecoration(
@@ -370,10 +458,23 @@ def init_widgets_list():
                      )
                  ],
                  ),
-        widget.Spacer(length = 8),
-        widget.GenPollText(
-                 update_interval = 60,
-                 func=lambda: shorten_uptime(subprocess.check_output(["uptime", "-p"]).decode().strip()[3:]),
+        bars.spec(widget.Spacer, length = 8),
+        bars.spec(modify, hub.HubText,
+                 hub = bar_hub,
+                 metric = 'pressure',
+                 foreground = colors[6],
+                 fmt = '⚖  Load: {}',
+                 decorations=[
+                     BorderDecoration(
+                         colour = colors[6],
+                         border_width = [0, 0, 2, 0],
+                     )
+                 ],
+                 ),
+        bars.spec(widget.Spacer, length = 8),
+        bars.spec(modify, hub.HubText,
+                 hub = bar_hub,
+                 metric = 'uptime',
                  foreground = colors[7],
                  fmt = '   Uptime:  {}',
                  decorations=[
@@ -383,15 +484,13 @@ def init_widgets_list():
                      )
                  ],
                  ),
-        widget.Spacer(length = 8),
-        widget.CheckUpdates(
-                 update_interval=1800,  
-                 distro="Arch_checkupdates", 
-                 display_format='   {updates} Updates',
-                 no_update_string='   0 Updates',
+        bars.spec(widget.Spacer, length = 8),
+        bars.spec(modify, hub.HubText,
+                 hub = bar_hub,
+                 metric = 'updates',
+                 foreground = colors[3],
+                 fmt = '   {} Updates',
                  mouse_callbacks = {'Button1': lambda: qtile.cmd_spawn(myTerm + ' -e sudo pacman -Syu')},
-                 colour_have_updates=colors[3],
-                 colour_no_updates=colors[3],
                  decorations=[
                      BorderDecoration(
                          colour=colors[3],
@@ -399,15 +498,12 @@ def init_widgets_list():
                       )
                    ],
                    ),
-        widget.Spacer(length = 8),
-        widget.DF(
-                 update_interval = 60,
+        bars.spec(widget.Spacer, length = 8),
+        bars.spec(modify, hub.HubText,
+                 hub = bar_hub,
+                 metric = 'disk',
                  foreground = colors[5],
-                 partition = '/',
-                 #format = '[{p}] {uf}{m} ({r:.0f}%)',
-                 format = '{uf}{m} free',
                  fmt = '🖴  Disk: {}',
-                 visible_on_warn = False,
                  mouse_callbacks = {'Button1': lambda: qtile.cmd_spawn('pcmanfm')},
                  decorations=[
                      BorderDecoration(
@@ -416,11 +512,28 @@ def init_widgets_list():
                      )
                  ],
                  ),
-        widget.Spacer(length = 8),
-        widget.Volume(
+        bars.spec(widget.Spacer, length = 8),
+        bars.spec(modify, hub.HubText,
+                 hub = bar_hub,
+                 metric = 'diskio',
+                 foreground = colors[5],
+                 fmt = '🖴  IO: {}',
+                 decorations=[
+                     BorderDecoration(
+                         colour = colors[5],
+                         border_width = [0, 0, 2, 0],
+                     )
+                 ],
+                 ),
+        bars.spec(widget.Spacer, length = 8),
+        bars.spec(modify, hub.HubText,
+                 hub = bar_hub,
+                 metric = 'volume',
                  foreground = colors[7],
                  fmt = '🕫  Vol: {}',
-                 mouse_callbacks = {'Button1': lambda: qtile.cmd_spawn('pavucontrol')},
+                 mouse_callbacks = {'Button1': lambda: qtile.cmd_spawn('pavucontrol'),
+                                    'Button4': lambda: volume_control.change(2),
+                                    'Button5': lambda: volume_control.change(-2)},
                  decorations=[
                      BorderDecoration(
                          colour = colors[7],
@@ -428,20 +541,37 @@ def init_widgets_list():
                      )
                  ],
                  ),
-        widget.Spacer(length = 8),
-        widget.Battery(
-				 foreground = colors[4],
-				 format = '󰂄  Bat:  {percent:2.0%}',
-				 mouse_callbacks = {'Button1': lambda: qtile.cmd_spawn('xfce4-power-manager-settings')},
-				 decorations=[
-					 BorderDecoration(
-                        colour = colors[4],
-                        border_width = [0, 0, 2, 0],
-					 )
-				 ],
-			     ),
-        widget.Spacer(length = 8),
-        widget.Clock(
+        bars.spec(widget.Spacer, length = 8),
+        bars.spec(modify, hub.HubText,
+                 hub = bar_hub,
+                 metric = 'backlight',
+                 foreground = colors[5],
+                 fmt = '☀  Bri: {}',
+                 mouse_callbacks = {'Button4': lambda: backlight_control.change(5),
+                                    'Button5': lambda: backlight_control.change(-5)},
+                 decorations=[
+                     BorderDecoration(
+                         colour = colors[5],
+                         border_width = [0, 0, 2, 0],
+                     )
+                 ],
+                 ),
+        bars.spec(widget.Spacer, length = 8),
+        bars.spec(modify, hub.HubText,
+                 hub = bar_hub,
+                 metric = 'battery',
+                 foreground = colors[4],
+                 fmt = '󰂄  Bat:  {}',
+                 mouse_callbacks = {'Button1': lambda: qtile.cmd_spawn('xfce4-power-manager-settings')},
+                 decorations=[
+                     BorderDecoration(
+                         colour = colors[4],
+                         border_width = [0, 0, 2, 0],
+                     )
+                 ],
+                 ),
+        bars.spec(widget.Spacer, length = 8),
+        bars.spec(widget.Clock,
                  foreground = colors[8],
                  format = "⏱  %a, %b %d - %I:%M",
                  decorations=[
@@ -451,59 +581,59 @@ def init_widgets_list():
                      )
                  ],
                  ),
-        widget.Spacer(length = 8),
-        widget.Systray(padding = 3),
-        widget.Spacer(length = 8),
+        bars.spec(widget.Spacer, length = 8),
+        bars.spec(widget.Systray, role = 'primary', padding = 3),
+        bars.spec(widget.Spacer, role = 'primary', length = 8),
 	    ]
     return widgets_list
 
 ##### SCREENS #####
+widget_specs = init_widgets_list()
+
 def init_widgets_screen1():
-    widgets_screen1 = init_widgets_list()
-    return widgets_screen1 
+    return bars.build(widget_specs, 0, bar_profile)
 
-# All other monitors' bars will display everything but widgets 26 (systray) and 27 (spacer).
-def init_widgets_screen2():
-    widgets_screen2 = init_widgets_list()
-    del widgets_screen2[26:28]
-    return widgets_screen2
+# All other monitors' bars will display everything but the primary-only widgets (systray and its spacer).
+def init_widgets_screen2(screen = 1):
+    return bars.build(widget_specs, screen, bar_profile)
 
 # For adding transparency to your bar, add (background="#00000000") to the "Screen" line(s)
 # For ex: Screen(top=bar.Bar(widgets=init_widgets_screen1(), background="#00000000", size=26)),
+# Each bar is built exactly once, here.
 def init_screens():
     return [Screen(top=bar.Bar(widgets=init_widgets_screen1(), size=26)),
-		    Screen(top=bar.Bar(widgets=init_widgets_screen2(), size=26)),
-		    Screen(top=bar.Bar(widgets=init_widgets_screen2(), size=26))]
+		    Screen(top=bar.Bar(widgets=init_widgets_screen2(1), size=26)),
+		    Screen(top=bar.Bar(widgets=init_widgets_screen2(2), size=26))]
 
 if __name__ in ["config", "__main__"]:
     screens = init_screens()
-    widgets_list = init_widgets_list()
-    widgets_screen1 = init_widgets_screen1()
-    widgets_screen2 = init_widgets_screen2()
 
 ##### SOME IMPORTANT FUNCTIONS #####
+# Moves go through winops, so the group left and the group entered are laid out once each
 def window_to_prev_group(qtile):
-    if qtile.currentWindow is not None:
-        i = qtile.groups.index(qtile.currentGroup)
-        qtile.currentWindow.togroup(qtile.groups[i - 1].name)
+    if qtile.current_window is not None:
+        i = qtile.groups.index(qtile.current_group)
+        winops.to_group(qtile, [qtile.current_window], qtile.groups[i - 1].name)
 
 def window_to_next_group(qtile):
-    if qtile.currentWindow is not None:
-        i = qtile.groups.index(qtile.currentGroup)
-        qtile.currentWindow.togroup(qtile.groups[i + 1].name)
+    if qtile.current_window is not None:
+        i = qtile.groups.index(qtile.current_group)
+        if i + 1 < len(qtile.groups):
+            winops.to_group(qtile, [qtile.current_window], qtile.groups[i + 1].name)
 
 def window_to_previous_screen(qtile):
     i = qtile.screens.index(qtile.current_screen)
-    if i != 0:
+    if i != 0 and qtile.current_window is not None:
         group = qtile.screens[i - 1].group.name
-        qtile.current_window.togroup(group)
+        winops.to_group(qtile, [qtile.current_window], group)
 
 def window_to_next_screen(qtile):
     i = qtile.screens.index(qtile.current_screen)
-    if i + 1 != len(qtile.screens):
+    if i + 1 != len(qtile.screens) and qtile.current_window is not None:
         group = qtile.screens[i + 1].group.name
-        qtile.current_window.togroup(group)
+        winops.to_group(qtile, [qtile.current_window], group)
 
+# Screen.set_group already lays out each of the two groups once
 def switch_screens(qtile):
     i = qtile.screens.index(qtile.current_screen)
     group = qtile.screens[i - 1].group
@@ -522,7 +652,9 @@ dgroups_app_rules = []  # type: list
 follow_mouse_focus = True
 bring_front_click = False
 cursor_warp = False
-floating_layout = layout.Floating(
+# Same rules and result as layout.Floating, but looked up through hash sets and
+# combined regexes instead of comparing every rule in turn (see rules.py).
+floating_layout = rules.Floating(
     border_focus=colors[8],
     border_width=2,
     float_rules=[
@@ -555,10 +687,47 @@ auto_minimize = True
 wl_input_rules = None
 
 ##### AUTOSTART PROGRAMS #####
+# Started concurrently by the autostart supervisor, each after the services in its
+# `after`; daemons that exit are started again. Daemons must stay in the
+# foreground (no --daemon) to be watched. Oneshots just run to completion.
+
+# picom is up once it owns the compositing manager selection, so nitrogen draws
+# the wallpaper with the compositor already running. Outside X11 there is
+# nothing to wait for.
+def compositor_running():
+    if qtile.core.name != 'x11':
+        return True
+    conn = qtile.core.conn
+    return conn.conn.core.GetSelectionOwner(conn.atoms['_NET_WM_CM_S0']).reply().owner != 0
+
+autostart_services = [
+    autostart.Service('picom', ['picom'], ready = compositor_running),
+    ### UNCOMMENT ONLY ONE OF THE TWO OPTIONS! ###
+    #1.Restore the Last Wallpaper
+    autostart.Service('nitrogen', ['nitrogen', '--restore'], after = ('picom',), oneshot = True),
+    #2.Get a Random Wallpaper
+    #autostart.Service('nitrogen', ['nitrogen', '--set-zoom-fill', '--random', '~/wallpapers'], after = ('picom',), oneshot = True),
+    autostart.Service('lxsession', ['lxsession']),
+    autostart.Service('copyq', ['copyq']),
+    #autostart.Service('flameshot', ['flameshot']),
+    autostart.Service('nm-applet', ['nm-applet']),
+    autostart.Service('redshift', ['redshift']),
+    autostart.Service('volumeicon', ['volumeicon']),
+    autostart.Service('xfce4-power-manager', ['xfce4-power-manager', '--no-daemon']),
+    autostart.Service('mpv', ['mpv', '--no-video', '~/Music/startup.mp3'], oneshot = True, restart = False),
+]
+autostart_supervisor = autostart.Supervisor(autostart_services)
+
 @hook.subscribe.startup_once
 def start_once():
-    home = os.path.expanduser('~')
-    subprocess.call([home + '/.config/qtile/autostart.sh'])
+    autostart_supervisor.start()
+
+# Nothing is restarted while the session goes away
+@hook.subscribe.shutdown
+def stop_autostart():
+    autostart_supervisor.stop()
     
 ##### JAVA APPS MIGHT NEED THIS #####
 wmname = "LG3D"
+
+bar_profile.config_loaded()
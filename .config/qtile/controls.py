@@ -0,0 +1,246 @@
+##### VOLUME AND BACKLIGHT CONTROLS #####
+# The media keys used to spawn `amixer set Master 5%+` or `brightnessctl set
+# +10%` per press, and the volume widget found out about it on its next poll.
+#
+# Mixer talks to ALSA in process through pyalsaaudio (python-pyalsaaudio) and
+# watches the mixer's poll descriptors on qtile's event loop, so any change,
+# from these keys, volumeicon or pavucontrol alike, is pushed to the bar at
+# once. Without pyalsaaudio it falls back to amixer run in the thread pool.
+# close() stops listening; the config calls it before a reload replaces the
+# Mixer and at shutdown, or the old readers would keep updating the old bar.
+#
+# Backlight writes /sys/class/backlight/*/brightness directly. The udev rule
+# brightnessctl installs makes that file writable for the video group; if it is
+# not, brightnessctl is used as before, run in the thread pool. Either way
+# on_change is called once the new level is set, so the bar shows it at once.
+#
+# Holding a key down sends a key repeat every ~30ms. Changes go through a
+# Throttle: the first one is applied right away, the ones arriving within the
+# next `rate` seconds are summed up and applied as a single write.
+
+import asyncio
+import glob
+import os
+import re
+import subprocess
+
+from libqtile.log_utils import logger
+
+try:
+    import alsaaudio
+except ImportError:
+    alsaaudio = None
+
+BACKLIGHT = '/sys/class/backlight'
+
+# Applies summed up changes at most once every rate seconds
+class Throttle:
+    def __init__(self, apply, rate=0.05):
+        self.apply = apply
+        self.rate = rate
+        self.pending = 0
+        self.handle = None
+
+    def add(self, delta):
+        self.pending += delta
+        if self.handle is None:
+            self.flush()
+
+    def flush(self):
+        self.handle = None
+        if not self.pending:
+            return
+        delta, self.pending = self.pending, 0
+        self.apply(delta)
+        self.handle = asyncio.get_event_loop().call_later(self.rate, self.flush)
+
+    def cancel(self):
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+        self.pending = 0
+
+class Mixer:
+    def __init__(self, control='Master', step=5, rate=0.05, on_change=None):
+        self.control = control
+        self.step = step
+        self.on_change = on_change
+        self.mixer = None
+        self.fds = []           # poll descriptors registered with the loop
+        self.loop = None
+        self.throttle = Throttle(self.apply, rate)
+
+    # Volume can be read without leaving the event loop
+    @property
+    def cheap(self):
+        return alsaaudio is not None
+
+    # Opens the ALSA mixer on first use and starts listening for its events
+    # when called from the running loop
+    def open(self):
+        if self.mixer is None:
+            self.mixer = alsaaudio.Mixer(self.control)
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return self.mixer
+            self.loop = loop
+            for fd, _ in self.mixer.polldescriptors():
+                loop.add_reader(fd, self.on_event)
+                self.fds.append(fd)
+        return self.mixer
+
+    # Stops listening for mixer events and closes the mixer
+    def close(self):
+        self.throttle.cancel()
+        for fd in self.fds:
+            self.loop.remove_reader(fd)
+        self.fds = []
+        self.loop = None
+        if self.mixer is not None:
+            self.mixer.close()
+            self.mixer = None
+
+    def on_event(self):
+        self.mixer.handleevents()
+        self.changed()
+
+    def changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+    # (percent, muted)
+    def state(self):
+        if alsaaudio is None:
+            output = subprocess.run(['amixer', 'get', self.control], capture_output=True, text=True).stdout
+            match = re.search(r'\[(\d+)%\](?:.*\[(on|off)\])?', output)
+            if match is None:
+                return None
+            return int(match.group(1)), match.group(2) == 'off'
+        mixer = self.open()
+        volumes = mixer.getvolume()
+        try:
+            muted = all(mixer.getmute())
+        except alsaaudio.ALSAAudioError:
+            muted = False
+        return sum(volumes) // len(volumes), muted
+
+    # What widget.Volume showed: '75%', or 'M' when muted
+    def text(self):
+        state = self.state()
+        if state is None:
+            return '--'
+        percent, muted = state
+        return 'M' if muted else '%d%%' % percent
+
+    # Changes the level by delta percent
+    def change(self, delta):
+        self.throttle.add(delta)
+
+    def up(self):
+        self.change(self.step)
+
+    def down(self):
+        self.change(-self.step)
+
+    def apply(self, delta):
+        if alsaaudio is None:
+            change = '%d%%%s' % (abs(delta), '+' if delta > 0 else '-')
+            self.amixer(change)
+            return
+        percent, _ = self.state()
+        volume = min(max(percent + delta, 0), 100)
+        if volume != percent:
+            self.mixer.setvolume(volume)
+
+    def toggle(self):
+        if alsaaudio is None:
+            self.amixer('toggle')
+            return
+        mixer = self.open()
+        try:
+            mixer.setmute(0 if all(mixer.getmute()) else 1)
+        except alsaaudio.ALSAAudioError:
+            logger.warning("mixer control %s has no mute switch", self.control)
+
+    # amixer fallback, run off the loop; the bar is told once it is done
+    def amixer(self, change):
+        future = asyncio.get_event_loop().run_in_executor(
+            None, subprocess.call, ['amixer', '-q', 'set', self.control, change])
+        future.add_done_callback(lambda _: self.changed())
+
+class Backlight:
+    def __init__(self, device=None, step=10, rate=0.05, on_change=None, root=BACKLIGHT):
+        self.device = device
+        self.step = step
+        self.on_change = on_change
+        self.root = root
+        self.maximum = None
+        self.writable = True
+        self.throttle = Throttle(self.apply, rate)
+
+    # The named device, or the one with the finest steps like brightnessctl picks
+    def path(self):
+        if self.device is None:
+            levels = {}
+            for path in glob.glob(self.root + '/*/max_brightness'):
+                try:
+                    with open(path) as f:
+                        levels[path] = int(f.read())
+                except (OSError, ValueError):     # unreadable devices are skipped
+                    continue
+            if not levels:
+                return None
+            self.device = os.path.basename(os.path.dirname(max(levels, key=levels.get)))
+        return os.path.join(self.root, self.device)
+
+    def read(self, name):
+        with open(os.path.join(self.path(), name)) as f:
+            return int(f.read())
+
+    def percent(self):
+        if self.path() is None:
+            return None
+        if self.maximum is None:
+            self.maximum = self.read('max_brightness')
+        return round(self.read('brightness') * 100 / self.maximum)
+
+    def text(self):
+        percent = self.percent()
+        return '--' if percent is None else '%d%%' % percent
+
+    # Changes the level by delta percent
+    def change(self, delta):
+        self.throttle.add(delta)
+
+    def up(self):
+        self.change(self.step)
+
+    def down(self):
+        self.change(-self.step)
+
+    # Works in raw units so that every step moves, even on panels with only
+    # a handful of levels
+    def apply(self, delta):
+        if self.percent() is None:
+            return
+        current = self.read('brightness')
+        step = round(abs(delta) * self.maximum / 100) or 1
+        value = min(max(current + (step if delta > 0 else -step), 0), self.maximum)
+        if self.writable:
+            try:
+                with open(os.path.join(self.path(), 'brightness'), 'w') as f:
+                    f.write(str(value))
+            except PermissionError:
+                logger.warning("%s is not writable, using brightnessctl", self.path())
+                self.writable = False
+        if not self.writable:
+            future = asyncio.get_event_loop().run_in_executor(
+                None, subprocess.call, ['brightnessctl', '-q', '-d', self.device, 'set', str(value)])
+            future.add_done_callback(lambda _: self.changed())
+            return
+        self.changed()
+
+    def changed(self):
+        if self.on_change is not None:
+            self.on_change()
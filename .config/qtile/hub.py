@@ -0,0 +1,178 @@
+##### SHARED SAMPLING HUB #####
+# Every screen gets its own bar and its own copy of every widget, so with three
+# monitors each polling widget used to do its work three times per interval.
+# The hub computes each registered metric once per interval and pushes the text
+# to every HubText widget showing it, on however many screens. Metrics sharing
+# an interval share one timer, so qtile wakes up once per distinct interval
+# rather than once per widget.
+#
+# Metrics run in qtile's thread pool executor, so a slow one never blocks the
+# event loop; the results are published back on the loop. Metrics registered
+# with inline=True only read a few bytes from /proc or call os.*, so they are
+# computed right on the event loop and skip the thread handoff altogether.
+#
+# Needs the sysmon package from ~/.config/openbox/pipemenus on sys.path
+# (config.py adds it before importing this module).
+
+import glob
+import os
+import weakref
+
+from libqtile.log_utils import logger
+from libqtile.widget import base
+
+from sysmon import collect
+
+class Hub:
+    def __init__(self):
+        self.metrics = {}       # name -> function returning the text to show
+        self.intervals = {}     # name -> seconds between polls
+        self.inline = set()     # names cheap enough to compute on the loop
+        self.values = {}        # name -> last published text
+        self.subscribers = {}   # name -> WeakSet of widgets showing it
+        self.timers = {}        # interval -> pending call_later handle
+        self.pending = set()    # names being computed right now
+        self.qtile = None
+
+    def register(self, name, func, interval, inline=False):
+        self.metrics[name] = func
+        self.intervals[name] = interval
+        if inline:
+            self.inline.add(name)
+
+    def subscribe(self, name, widget):
+        self.qtile = widget.qtile
+        self.subscribers.setdefault(name, weakref.WeakSet()).add(widget)
+        if name in self.values:
+            widget.text = self.values[name]
+        elif name not in self.pending:
+            self.pending.add(name)
+            self.qtile.call_soon(self.poll, [name])
+        interval = self.intervals[name]
+        if interval not in self.timers:
+            self.timers[interval] = self.qtile.call_later(interval, self.tick, interval)
+
+    def unsubscribe(self, name, widget):
+        self.subscribers.get(name, weakref.WeakSet()).discard(widget)
+
+    # Polls every watched metric with this interval and schedules the next tick.
+    # The timer dies by itself once nobody watches any of them any more.
+    def tick(self, interval):
+        names = [name for name, every in self.intervals.items()
+                 if every == interval and self.subscribers.get(name)]
+        if not names:
+            self.timers.pop(interval, None)
+            return
+        self.timers[interval] = self.qtile.call_later(interval, self.tick, interval)
+        self.poll(names)
+
+    # Re-polls one metric right away, after running action in the executor
+    # first if given (e.g. a volume change the widget should show immediately)
+    def refresh(self, name, action=None):
+        if self.qtile is not None:
+            self.poll([name], action)
+
+    def poll(self, names, action=None):
+        if action is None:
+            inline = [name for name in names if name in self.inline]
+            self.pending.difference_update(inline)
+            self.publish(self.compute(inline))
+            names = [name for name in names if name not in self.inline]
+            if not names:
+                return
+        self.pending.update(names)
+        future = self.qtile.run_in_executor(self.compute, names, action)
+        future.add_done_callback(self.on_done)
+
+    def compute(self, names, action=None):
+        if action is not None:
+            action()
+        results = {}
+        for name in names:
+            try:
+                results[name] = str(self.metrics[name]())
+            except Exception:
+                logger.exception("hub metric %s failed", name)
+                results[name] = '--'
+        return results
+
+    def on_done(self, future):
+        try:
+            results = future.result()
+        except Exception:
+            logger.exception("hub poll failed")
+            self.pending.clear()
+            return
+        self.pending.difference_update(results)
+        self.publish(results)
+
+    def publish(self, results):
+        for name, text in results.items():
+            if self.values.get(name) == text:
+                continue
+            self.values[name] = text
+            for widget in list(self.subscribers.get(name, ())):
+                widget.update(text)
+
+# Shows one metric of a Hub; all the polling is done by the hub
+class HubText(base._TextBox):
+    defaults = [
+        ("hub", None, "Hub the metric is registered with"),
+        ("metric", None, "Name of the hub metric to show"),
+    ]
+
+    def __init__(self, text=" ", **config):
+        base._TextBox.__init__(self, text, **config)
+        self.add_defaults(HubText.defaults)
+
+    def _configure(self, qtile, bar):
+        base._TextBox._configure(self, qtile, bar)
+        self.hub.subscribe(self.metric, self)
+
+    def finalize(self):
+        self.hub.unsubscribe(self.metric, self)
+        base._TextBox.finalize(self)
+
+##### METRICS #####
+# Formatted the way the stock qtile widgets they replace printed them.
+
+# Used memory in MiB like widget.Memory's '{MemUsed: .0f}{mm}'
+def memory_used():
+    meminfo = collect.read_meminfo()
+    used = (meminfo['MemTotal'] - meminfo['MemFree'] - meminfo.get('Buffers', 0)
+            - meminfo.get('Cached', 0) - meminfo.get('SReclaimable', 0))
+    if used < 0:
+        used = meminfo['MemTotal'] - meminfo['MemFree']
+    return '{: .0f}M'.format(used / 1024)
+
+# Space left for normal users like widget.DF's '{uf}{m} free'
+def disk_free(partition='/'):
+    st = os.statvfs(partition)
+    return '{}G free'.format(st.f_frsize * st.f_bavail // 1024 ** 3)
+
+# Charge of the first battery like widget.Battery's '{percent:2.0%}'
+def battery_percent():
+    for path in sorted(glob.glob('/sys/class/power_supply/BAT*/capacity')):
+        with open(path) as f:
+            return '{:2.0%}'.format(int(f.read()) / 100)
+    return 'N/A'
+
+# Running kernel, what `uname -r` printed
+def kernel_release():
+    return os.uname().release
+
+# Time since boot in the shortened `uptime -p` form the bar always showed,
+# e.g. '2 weeks, 3 days, 4h, 5m'
+def uptime_short():
+    minutes = int(collect.read_uptime()) // 60
+    years, minutes = divmod(minutes, 525600)
+    weeks, minutes = divmod(minutes, 10080)
+    days, minutes = divmod(minutes, 1440)
+    hours, minutes = divmod(minutes, 60)
+    parts = ['{} {}{}'.format(count, unit, '' if count == 1 else 's')
+             for count, unit in ((years, 'year'), (weeks, 'week'), (days, 'day')) if count]
+    if hours:
+        parts.append('{}h'.format(hours))
+    if minutes or not parts:
+        parts.append('{}m'.format(minutes))
+    return ', '.join(parts)
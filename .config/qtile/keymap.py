@@ -0,0 +1,165 @@
+##### KEYMAP #####
+# Compiles `keys` into the tables qtile dispatches from: one dict per chord
+# level, keyed by (modifier mask, key name) the way qtile's X11 backend sees a
+# key press (key names are case insensitive, modifiers are a bit mask, so
+# ["shift", "mod4"] and ["mod4", "shift"] are the same binding). A key press is
+# one dict lookup at every level, however many bindings there are.
+#
+# qtile itself only logs "Key spec duplicated" and keeps the later binding, and
+# never looks inside chords or at .when() conditions. compile() reports:
+#
+#   conflicts  the same keys bound twice at one level, a key bound both on its
+#              own and as the start of a chord, or an unknown modifier; only one
+#              of them can ever run
+#   aliases    the same command on more than one binding, e.g. mod4+shift+q and
+#              the chord mod4+p q both spawning dm-logout
+#   dead       .when(layout=[...]) commands naming only layouts that are not in
+#              `layouts`, and bindings that therefore never do anything
+#
+# config.py calls check() once all keys and layouts are defined, which refuses
+# to load a config with conflicts and logs the rest.
+# tools/keymap-check.py prints the whole report and times dispatch.
+
+from typing import NamedTuple
+
+try:
+    from libqtile.log_utils import logger
+except ImportError:
+    logger = None
+
+# As in libqtile/backend/x11/xcbq.py
+MODMASKS = {
+    'shift': 1 << 0,
+    'lock': 1 << 1,
+    'control': 1 << 2,
+    'mod1': 1 << 3,
+    'mod2': 1 << 4,
+    'mod3': 1 << 5,
+    'mod4': 1 << 6,
+    'mod5': 1 << 7,
+}
+
+class KeymapError(Exception):
+    pass
+
+class Stroke(NamedTuple):
+    mask: int
+    key: str
+
+# The Stroke for a Key or KeyChord, and the modifiers qtile would not know
+def stroke(binding):
+    mask = 0
+    unknown = []
+    for modifier in binding.modifiers:
+        if modifier.lower() in MODMASKS:
+            mask |= MODMASKS[modifier.lower()]
+        else:
+            unknown.append(modifier)
+    key = binding.key.lower() if isinstance(binding.key, str) else binding.key
+    return Stroke(mask, key), unknown
+
+def is_chord(binding):
+    return hasattr(binding, 'submappings')
+
+# "mod4+shift+q" for a binding, as written in the config
+def stroke_name(binding):
+    return '+'.join(list(binding.modifiers) + [str(binding.key)])
+
+# Something to compare commands by: the call path, name and arguments. Functions
+# (lazy.function, @lazy.layout.function) compare by identity, so two lambdas
+# are two different commands.
+def command_key(command):
+    args = tuple(arg if callable(arg) else repr(arg) for arg in command.args)
+    selectors = tuple((name, repr(selector)) for name, selector in command.selectors)
+    return selectors, command.name, args, repr(sorted(command.kwargs.items()))
+
+def command_name(command):
+    path = '.'.join(name for name, _ in command.selectors)
+    args = ', '.join(repr(getattr(arg, '__qualname__', arg)) for arg in command.args)
+    return '%s%s(%s)' % (path + '.' if path else '', command.name, args)
+
+class Keymap:
+    def __init__(self):
+        self.tables = {}        # chord path -> {Stroke: Key or KeyChord}
+        self.bindings = []      # (path, Key) of every key that runs commands
+        self.conflicts = []
+        self.aliases = []
+        self.dead = []
+
+    # The Key or KeyChord a sequence of Strokes ends on, or None
+    def resolve(self, path):
+        return self.tables.get(tuple(path[:-1]), {}).get(path[-1])
+
+    def __len__(self):
+        return len(self.bindings)
+
+    def report(self):
+        lines = ['bindings: %d, chords: %d' % (len(self.bindings), len(self.tables) - 1)]
+        for title, problems in (('conflicts', self.conflicts), ('aliases', self.aliases), ('dead', self.dead)):
+            lines.append('%s: %d' % (title, len(problems)))
+            lines.extend('  ' + problem for problem in problems)
+        return '\n'.join(lines)
+
+def describe(binding):
+    return repr(binding.desc) if binding.desc else 'no description'
+
+# layouts: the configured layouts (or their names), for the dead command checks;
+# None skips them
+def compile(keys, layouts=None):
+    keymap = Keymap()
+    names = None if layouts is None else {getattr(layout, 'name', layout) for layout in layouts}
+    users = {}
+
+    def add(path, prefix, bindings):
+        table = keymap.tables.setdefault(path, {})
+        for binding in bindings:
+            step, unknown = stroke(binding)
+            here = path + (step,)
+            name = prefix + stroke_name(binding)
+            if unknown:
+                keymap.conflicts.append('%s: unknown modifier %s' % (name, ', '.join(unknown)))
+            previous = table.get(step)
+            if previous is not None:
+                if is_chord(previous) or is_chord(binding):
+                    keymap.conflicts.append('%s is both a key (%s) and the start of a chord'
+                                            % (name, describe(previous if not is_chord(previous) else binding)))
+                else:
+                    keymap.conflicts.append('%s bound twice: %s and %s; only the last one runs'
+                                            % (name, describe(previous), describe(binding)))
+            table[step] = binding
+            if is_chord(binding):
+                add(here, name + ' ', binding.submappings)
+                continue
+            if not binding.commands:
+                # The Escape qtile adds to every chord to leave it
+                continue
+            keymap.bindings.append((here, binding))
+            live = 0
+            for command in binding.commands:
+                only = getattr(command, '_layouts', None)
+                if names is not None and only and not only & names:
+                    keymap.dead.append('%s: %s only runs in %s, not in any configured layout'
+                                       % (name, command_name(command), ', '.join(sorted(only))))
+                    continue
+                live += 1
+                users.setdefault(command_key(command), []).append((name, command))
+            if not live:
+                keymap.dead.append('%s (%s) never does anything' % (name, describe(binding)))
+
+    add((), '', keys)
+    for used in users.values():
+        paths = sorted({name for name, _ in used})
+        if len(paths) > 1:
+            keymap.aliases.append('%s on %s' % (command_name(used[0][1]), ', '.join(paths)))
+    return keymap
+
+# compile() for the config: raises KeymapError on conflicts and logs aliases
+# and dead commands
+def check(keys, layouts=None):
+    keymap = compile(keys, layouts)
+    if keymap.conflicts:
+        raise KeymapError('key binding conflicts:\n  ' + '\n  '.join(keymap.conflicts))
+    if logger is not None:
+        for problem in keymap.aliases + keymap.dead:
+            logger.warning('keymap: %s', problem)
+    return keymap
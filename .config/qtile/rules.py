@@ -0,0 +1,123 @@
+##### WINDOW RULES #####
+# qtile decides whether a new window floats by calling Match.compare for every
+# float rule in turn, and each compare asks the window for its properties
+# again; the window type and role are X round trips every time. With the
+# default rules plus ours that is a dozen or more round trips per mapped
+# window, more the longer the list gets, and browsers map and unmap short lived
+# popups all the time.
+#
+# RuleMatcher sorts the rules once:
+#
+#   Match(wm_class="Yad")              exact values, one set per property
+#   Match(title=re.compile("^Pic"))    patterns, one combined regex per property
+#   anything else                      (func=, several properties, MatchAll...)
+#                                      compared one by one, as before
+#
+# A window then has each property read once and looked up in the sets and
+# regexes; the remaining rules only run when none of those matched. The result
+# is the same as qtile's: a window floats if any rule matches it.
+#
+# Floating is layout.Floating using a RuleMatcher. The rules are compiled when
+# it is created, so changing float_rules afterwards takes a config reload.
+
+import re
+
+from libqtile import layout
+from libqtile.config import Match
+
+try:
+    import xcffib.xproto
+    WINDOW_ERRORS = (xcffib.xproto.WindowError, xcffib.xproto.AccessError)
+except ImportError:
+    WINDOW_ERRORS = ()
+
+# Properties single-property rules are looked up by, the ones qtile has cached
+# on the window first
+PROPERTIES = ('wm_class', 'wm_instance_class', 'title', 'role', 'wm_type')
+
+# Back references refer to groups by number or name, which a combined regex
+# would renumber or repeat; such patterns are left as they are
+BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=')
+
+# The values of a window property, as Match.compare sees them
+def read(win, name):
+    if name == 'title':
+        value = win.name
+    elif name == 'role':
+        value = win.get_wm_role()
+    elif name == 'wm_type':
+        value = win.get_wm_type()
+    else:
+        wm_class = win.get_wm_class()
+        if not wm_class:
+            return ()
+        return wm_class if name == 'wm_class' else (wm_class[0],)
+    return () if value is None else (value,)
+
+# Single alternation of patterns sharing their flags; patterns that cannot be
+# combined (inline flags in the middle, say) stay separate
+def combine(patterns):
+    if len(patterns) == 1:
+        return patterns
+    try:
+        return [re.compile('|'.join('(?:%s)' % pattern.pattern for pattern in patterns), patterns[0].flags)]
+    except re.error:
+        return patterns
+
+class RuleMatcher:
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.exact = {}         # property -> set of values
+        self.patterns = {}      # property -> [compiled regex]
+        self.others = []        # rules compared one by one
+        grouped = {}
+        for rule in self.rules:
+            properties = getattr(rule, '_rules', None)
+            if type(rule) is Match and properties and len(properties) == 1:
+                (name, value), = properties.items()
+                if name in PROPERTIES and isinstance(value, str):
+                    self.exact.setdefault(name, set()).add(value)
+                    continue
+                if (name in PROPERTIES and isinstance(value, re.Pattern) and isinstance(value.pattern, str)
+                        and not BACKREFERENCE.search(value.pattern)):
+                    grouped.setdefault((name, value.flags), []).append(value)
+                    continue
+            self.others.append(rule)
+        for (name, _), patterns in grouped.items():
+            self.patterns.setdefault(name, []).extend(combine(patterns))
+        self.order = [name for name in PROPERTIES if name in self.exact or name in self.patterns]
+
+    # A property that cannot be read (the window is already gone, say) only
+    # rules out the rules on that property; the others are still tried
+    def match(self, win):
+        for name in self.order:
+            try:
+                values = read(win, name)
+            except WINDOW_ERRORS:
+                continue
+            exact = self.exact.get(name)
+            if exact is not None and any(value in exact for value in values):
+                return True
+            for pattern in self.patterns.get(name, ()):
+                if any(pattern.match(value) for value in values):
+                    return True
+        for rule in self.others:
+            try:
+                if win.match(rule):
+                    return True
+            except WINDOW_ERRORS:
+                continue
+        return False
+
+    def __repr__(self):
+        return '<RuleMatcher %d exact, %d patterns, %d other>' % (
+            sum(len(values) for values in self.exact.values()),
+            sum(len(patterns) for patterns in self.patterns.values()), len(self.others))
+
+class Floating(layout.Floating):
+    def __init__(self, float_rules=None, no_reposition_rules=None, **config):
+        super().__init__(float_rules, no_reposition_rules, **config)
+        self.matcher = RuleMatcher(self.float_rules)
+
+    def match(self, win):
+        return self.matcher.match(win)
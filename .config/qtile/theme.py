@@ -0,0 +1,114 @@
+##### THEMES #####
+# Switches between the colour schemes in colors.py while qtile runs. Changing
+# `colors = colors.DoomOne` used to take a reload_config, which builds every
+# widget and bar on all three screens again.
+#
+# The config takes its colours from Themes.palette: one list per slot, and
+# every layout, widget and BorderDecoration is handed those very lists
+# (colors[3] and so on), which qtile reads whenever it paints. Switching
+# overwrites the slots in place with the new scheme's colours, lays out the
+# visible groups once (window borders) and redraws the bars once. Nothing is
+# created or configured again.
+#
+# The schemes are checked and resolved to '#rrggbb' tuples once, when the
+# config loads; a scheme with a bad colour or the wrong number of slots is left
+# out with a warning rather than breaking the config; if that leaves out the
+# default, the first good scheme is used instead, and only colors.py without a
+# single good scheme is a ConfigError. The scheme last switched to is
+# remembered and used again after a restart.
+
+import os
+import re
+import time
+
+from libqtile.confreader import ConfigError
+from libqtile.log_utils import logger
+
+STATE = os.path.expanduser('~/.cache/qtile/theme')
+
+COLOUR = re.compile(r'#?([0-9a-fA-F]{6}|[0-9a-fA-F]{8})')
+
+# A scheme from colors.py as a tuple of slots, each a tuple of '#rrggbb' strings
+def resolve(scheme):
+    slots = []
+    for slot in scheme:
+        resolved = []
+        for value in ([slot] if isinstance(slot, str) else slot):
+            match = COLOUR.fullmatch(str(value).strip())
+            if not match:
+                raise ValueError('not a colour: %r' % (value,))
+            resolved.append('#' + match.group(1).lower())
+        slots.append(tuple(resolved))
+    return tuple(slots)
+
+# {name: resolved scheme} of every scheme in the module, in the order written.
+# Without a size, every scheme needs as many slots as the first good one.
+def load_schemes(module, size=None):
+    schemes = {}
+    for name, value in vars(module).items():
+        if name.startswith('_') or not isinstance(value, list):
+            continue
+        try:
+            scheme = resolve(value)
+        except ValueError as e:
+            logger.warning("colour scheme %s left out: %s", name, e)
+            continue
+        size = size or len(scheme)
+        if len(scheme) != size:
+            logger.warning("colour scheme %s left out: %d colours instead of %d", name, len(scheme), size)
+            continue
+        schemes[name] = scheme
+    return schemes
+
+class Themes:
+    def __init__(self, module, default='DoomOne', state=STATE):
+        reference = getattr(module, default, None)
+        self.schemes = load_schemes(module, len(reference) if isinstance(reference, list) else None)
+        self.names = list(self.schemes)
+        if not self.names:
+            raise ConfigError('no usable colour scheme in %s' % module.__name__)
+        if default not in self.schemes:
+            logger.warning("colour scheme %s is missing or broken, using %s", default, self.names[0])
+            default = self.names[0]
+        self.state = state
+        self.current = self.saved() or default
+        # The lists the config hands out; apply() changes their contents
+        self.palette = [list(slot) for slot in self.schemes[self.current]]
+
+    def saved(self):
+        try:
+            with open(self.state) as f:
+                name = f.read().strip()
+        except OSError:
+            return None
+        return name if name in self.schemes else None
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.state), exist_ok=True)
+            with open(self.state, 'w') as f:
+                f.write(self.current + '\n')
+        except OSError as e:
+            logger.warning("could not remember theme %s: %s", self.current, e)
+
+    def apply(self, qtile, name):
+        start = time.perf_counter()
+        for slot, colours in zip(self.palette, self.schemes[name]):
+            slot[:] = colours
+        self.current = name
+        for group in qtile.groups:
+            if group.screen is not None:
+                group.layout_all()
+        for screen in qtile.screens:
+            for gap in (screen.top, screen.bottom, screen.left, screen.right):
+                if gap is not None and hasattr(gap, 'widgets'):
+                    gap.draw()
+        self.save()
+        logger.info("theme %s applied in %.1f ms", name, (time.perf_counter() - start) * 1000)
+
+    # The next (step=1) or previous (step=-1) scheme in colors.py
+    def cycle(self, qtile, step=1):
+        if not self.names:
+            return
+        index = self.names.index(self.current) if self.current in self.names else -1
+        self.apply(qtile, self.names[(index + step) % len(self.names)])
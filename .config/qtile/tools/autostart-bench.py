@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+#
+# AUTOSTART-BENCH
+# Times the autostart services of the config two ways, with every program
+# replaced by a stub in a temporary directory (a daemon stub just sleeps, a
+# oneshot stub exits after 50 ms), so nothing real is started. A daemon with a
+# readiness probe gets a stub that only turns ready after 100 ms, the way picom
+# takes a moment to claim the compositing manager selection:
+#
+#   - the old way: a shell script starting each one with `&`, run with
+#     subprocess.call as the startup_once hook did. The time it took is time
+#     qtile's event loop was blocked.
+#   - autostart.Supervisor: how long start() blocks, and when each service was
+#     up or done.
+#
+# A last run has one daemon crash right after starting, to show the restarts
+# and the backoff between them (shortened to 50 ms here).
+#
+# Loading config.py needs qtile and qtile-extras, as on the desktop itself;
+# without them a copy of its service list is used.
+#
+# Usage: autostart-bench.py
+
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, here)
+
+import autostart
+from autostart import Service
+
+SERVICES = [
+    Service('picom', ['picom'], ready=lambda: True),
+    Service('nitrogen', ['nitrogen', '--restore'], after=('picom',), oneshot=True),
+    Service('lxsession', ['lxsession']),
+    Service('copyq', ['copyq']),
+    Service('nm-applet', ['nm-applet']),
+    Service('redshift', ['redshift']),
+    Service('volumeicon', ['volumeicon']),
+    Service('xfce4-power-manager', ['xfce4-power-manager', '--no-daemon']),
+    Service('mpv', ['mpv', '--no-video', '~/Music/startup.mp3'], oneshot=True, restart=False),
+]
+
+def services():
+    try:
+        import config
+    except Exception as e:
+        print('config.py not loaded (%s: %s); using a copy of its services' % (type(e).__name__, e))
+        return SERVICES
+    return config.autostart_services
+
+# One executable per program in bin; each stub writes its pid to pids
+def make_stubs(bin, pids, services, crashing=()):
+    for service in services:
+        program = os.path.basename(service.command[0])
+        if program in crashing:
+            body = 'exit 1'
+        elif service.oneshot:
+            body = 'sleep 0.05'
+        elif service.ready is not None:
+            body = 'sleep 0.1\ntouch %s.ready\nexec sleep 600' % os.path.join(bin, program)
+        else:
+            body = 'exec sleep 600'
+        with open(os.path.join(bin, program), 'w') as f:
+            f.write('#!/bin/sh\necho $$ >> %s\n%s\n' % (pids, body))
+        os.chmod(os.path.join(bin, program), 0o755)
+
+# The services with their readiness probes replaced by one for the stub's file
+def stub_probes(bin, services):
+    probe = lambda path: lambda: os.path.exists(path)
+    return [service._replace(ready=probe(os.path.join(bin, os.path.basename(service.command[0]) + '.ready')))
+            if service.ready is not None else service for service in services]
+
+def kill_stubs(pids):
+    try:
+        with open(pids) as f:
+            for line in f:
+                try:
+                    os.kill(int(line), signal.SIGTERM)
+                except (ValueError, OSError):
+                    pass
+    except OSError:
+        pass
+    open(pids, 'w').close()
+    bin = os.path.dirname(pids)
+    for name in os.listdir(bin):
+        if name.endswith('.ready'):
+            os.unlink(os.path.join(bin, name))
+
+def script_run(bin, services):
+    script = os.path.join(bin, 'autostart.sh')
+    with open(script, 'w') as f:
+        f.write('#!/usr/bin/env bash\n')
+        for service in services:
+            f.write(' '.join(service.command) + ' &\n')
+    os.chmod(script, 0o755)
+    start = time.perf_counter()
+    subprocess.call([script])
+    print('autostart.sh: blocked %.1f ms' % ((time.perf_counter() - start) * 1000))
+
+async def supervisor_run(services, pids, watch=0, **options):
+    supervisor = autostart.Supervisor(services, **options)
+    start = time.perf_counter()
+    supervisor.start()
+    blocked = time.perf_counter() - start
+    await supervisor.tasks[-1]
+    await asyncio.sleep(watch)
+    print('Supervisor: start() blocked %.2f ms' % (blocked * 1000))
+    print('\n'.join(supervisor.lines()))
+    supervisor.stopping = True
+    kill_stubs(pids)
+    await asyncio.gather(*supervisor.tasks[:-1])
+
+def main():
+    with tempfile.TemporaryDirectory() as bin:
+        listed = stub_probes(bin, services())
+        pids = os.path.join(bin, 'pids')
+        os.environ['PATH'] = bin + os.pathsep + os.environ['PATH']
+        make_stubs(bin, pids, listed)
+        try:
+            script_run(bin, listed)
+            time.sleep(0.2)
+            kill_stubs(pids)
+            asyncio.run(supervisor_run(listed, pids))
+            crashing = os.path.basename(listed[-2].command[0])
+            make_stubs(bin, pids, listed, crashing=(crashing,))
+            print('\n%s crashing:' % crashing)
+            asyncio.run(supervisor_run(listed, pids, watch=1, backoff=0.05, max_restarts=3))
+        finally:
+            kill_stubs(pids)
+
+if __name__ == '__main__':
+    main()
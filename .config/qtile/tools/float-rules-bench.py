@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+#
+# FLOAT-RULES-BENCH
+# Replays a stream of window maps through qtile's layout.Floating.match and
+# through rules.Floating (see rules.py), with this config's float rules and with
+# 100, 300 and 1000 more rules added (exact classes and titles, and title
+# patterns). It checks both float exactly the same windows, and prints the time
+# per mapped window and how many property round trips to the X server it took.
+#
+# The stream is a JSON lines file, one mapped window per line:
+#   {"wm_class": ["Navigator", "firefox"], "title": "...", "role": "...",
+#    "wm_type": "normal", "fixed_size": false, "fixed_ratio": false}
+# Record one from the running X session with --record FILE (needs xprop; stop
+# it with ctrl-c). Without a file a built-in session is replayed: a browser
+# opening and closing popups and dialogs, terminals, a file manager and
+# gitk/yad dialogs.
+#
+# Usage: float-rules-bench.py [STREAM.jsonl]
+#        float-rules-bench.py --record STREAM.jsonl
+
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+here = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, here)
+
+SESSION = [
+    {'wm_class': ['Navigator', 'librewolf'], 'title': 'Mozilla LibreWolf', 'role': 'browser', 'wm_type': 'normal'},
+    {'wm_class': ['Dialog', 'librewolf'], 'title': 'Opening file.pdf', 'role': 'Dialog', 'wm_type': 'dialog'},
+    {'wm_class': ['Toplevel', 'librewolf'], 'title': 'Picture-in-Picture', 'role': 'PictureInPicture', 'wm_type': 'normal'},
+    {'wm_class': ['Navigator', 'librewolf'], 'title': 'Library', 'role': 'organizer', 'wm_type': 'normal'},
+    {'wm_class': ['Popup', 'librewolf'], 'title': '', 'role': 'alert', 'wm_type': 'normal'},
+    {'wm_class': ['download', 'librewolf'], 'title': 'Downloads', 'role': '', 'wm_type': 'normal'},
+    {'wm_class': ['Alacritty', 'Alacritty'], 'title': 'Alacritty', 'role': None, 'wm_type': 'normal'},
+    {'wm_class': ['Alacritty', 'Alacritty'], 'title': 'htop', 'role': None, 'wm_type': 'normal'},
+    {'wm_class': ['pcmanfm', 'Pcmanfm'], 'title': 'Home', 'role': None, 'wm_type': 'normal'},
+    {'wm_class': ['pcmanfm', 'Pcmanfm'], 'title': 'Copying Files', 'role': None, 'wm_type': 'dialog'},
+    {'wm_class': ['geany', 'Geany'], 'title': 'config.py - geany', 'role': None, 'wm_type': 'normal'},
+    {'wm_class': ['gitk', 'Gitk'], 'title': 'branchdialog', 'role': None, 'wm_type': 'normal'},
+    {'wm_class': ['makebranch', 'Gitk'], 'title': 'Make branch', 'role': None, 'wm_type': 'normal'},
+    {'wm_class': ['yad', 'Yad'], 'title': 'Question', 'role': None, 'wm_type': 'normal'},
+    {'wm_class': ['qalculate-gtk', 'Qalculate-gtk'], 'title': 'Qalculate!', 'role': None, 'wm_type': 'normal'},
+    {'wm_class': ['thunderbird', 'thunderbird'], 'title': 'Inbox - Thunderbird', 'role': '3pane', 'wm_type': 'normal'},
+    {'wm_class': ['pavucontrol', 'Pavucontrol'], 'title': 'Volume Control', 'role': None, 'wm_type': 'normal',
+     'fixed_size': True},
+    {'wm_class': ['mpv', 'mpv'], 'title': 'video.mkv - mpv', 'role': None, 'wm_type': 'normal', 'fixed_ratio': True},
+]
+# A browser session maps its main windows once and popups and dialogs again and again
+REPLAY = SESSION * 5 + [SESSION[i] for i in (1, 2, 4, 5) * 40]
+
+##### RECORDING #####
+
+PROPERTIES = ['WM_CLASS', '_NET_WM_NAME', 'WM_NAME', 'WM_WINDOW_ROLE', '_NET_WM_WINDOW_TYPE', 'WM_NORMAL_HINTS']
+
+# The properties of one window, from `xprop -id`
+def describe(wid):
+    try:
+        out = subprocess.run(['xprop', '-id', wid] + PROPERTIES, capture_output=True, text=True).stdout
+    except OSError:
+        return None
+    strings = lambda line: re.findall(r'"((?:[^"\\]|\\.)*)"', line)
+    win = {'wm_class': [], 'title': '', 'role': None, 'wm_type': None, 'fixed_size': False, 'fixed_ratio': False}
+    minimum = maximum = None
+    for line in out.splitlines():
+        if line.startswith('WM_CLASS('):
+            win['wm_class'] = strings(line)
+        elif line.startswith('_NET_WM_NAME(') or (line.startswith('WM_NAME(') and not win['title']):
+            win['title'] = (strings(line) or [''])[0]
+        elif line.startswith('WM_WINDOW_ROLE('):
+            win['role'] = (strings(line) or [None])[0]
+        elif line.startswith('_NET_WM_WINDOW_TYPE('):
+            win['wm_type'] = line.split('=')[-1].split(',')[0].strip().replace('_NET_WM_WINDOW_TYPE_', '').lower()
+        elif 'minimum size:' in line:
+            minimum = line.split(':')[-1].strip()
+        elif 'maximum size:' in line:
+            maximum = line.split(':')[-1].strip()
+        elif 'aspect ratio:' in line:
+            win['fixed_ratio'] = True
+    win['fixed_size'] = minimum is not None and minimum == maximum
+    return win
+
+# Appends every newly mapped client to path until interrupted
+def record(path):
+    spy = subprocess.Popen(['xprop', '-root', '-spy', '_NET_CLIENT_LIST'], stdout=subprocess.PIPE, text=True)
+    known = None
+    count = 0
+    try:
+        with open(path, 'a') as f:
+            for line in spy.stdout:
+                clients = set(re.findall(r'0x[0-9a-f]+', line))
+                if known is not None:
+                    for wid in clients - known:
+                        win = describe(wid)
+                        if win is not None:
+                            f.write(json.dumps(win) + '\n')
+                            f.flush()
+                            count += 1
+                            print('%d: %s' % (count, win['wm_class']))
+                known = clients
+    except KeyboardInterrupt:
+        pass
+    finally:
+        spy.terminate()
+
+##### REPLAY #####
+
+# A mapped window as far as Match.compare is concerned. WM_CLASS, the title and
+# the size hints are kept on qtile's window object; the role and the window type
+# are fetched from the X server on every call, counted here as round trips.
+class Window:
+    round_trips = 0
+
+    def __init__(self, props):
+        self.props = props
+        self.name = props.get('title')
+
+    def get_wm_class(self):
+        return self.props.get('wm_class')
+
+    def get_wm_role(self):
+        Window.round_trips += 1
+        return self.props.get('role')
+
+    def get_wm_type(self):
+        Window.round_trips += 1
+        return self.props.get('wm_type')
+
+    def has_fixed_size(self):
+        return self.props.get('fixed_size', False)
+
+    def has_fixed_ratio(self):
+        return self.props.get('fixed_ratio', False)
+
+    def match(self, rule):
+        return rule.compare(self)
+
+def extra_rules(count):
+    from libqtile.config import Match
+    extra = []
+    for i in range(count):
+        if i % 5 < 3:
+            extra.append(Match(wm_class='app-%d' % i))
+        elif i % 5 == 3:
+            extra.append(Match(title='Tool window %d' % i))
+        else:
+            extra.append(Match(title=re.compile(r'^Report %d\b' % i)))
+    return extra
+
+def replay(floating, windows):
+    Window.round_trips = 0
+    start = time.perf_counter()
+    floats = [floating.match(win) for win in windows]
+    elapsed = time.perf_counter() - start
+    return floats, elapsed * 1e6 / len(windows), Window.round_trips / len(windows)
+
+def main():
+    if sys.argv[1:2] == ['--record']:
+        record(sys.argv[2])
+        return
+    from libqtile import layout
+    import config
+    import rules
+
+    if sys.argv[1:]:
+        with open(sys.argv[1]) as f:
+            stream = [json.loads(line) for line in f if line.strip()]
+    else:
+        stream = REPLAY
+    windows = [Window(props) for props in stream]
+    base = config.floating_layout.float_rules
+    print('%d window maps, %d of them distinct' % (len(windows), len({json.dumps(p, sort_keys=True) for p in stream})))
+    for extra in (0, 100, 300, 1000):
+        float_rules = base + extra_rules(extra)
+        stock = layout.Floating(float_rules=float_rules)
+        compiled = rules.Floating(float_rules=float_rules)
+        stock_floats, stock_us, stock_trips = replay(stock, windows)
+        floats, us, trips = replay(compiled, windows)
+        assert floats == stock_floats, 'compiled rules float different windows'
+        print('%4d rules: layout.Floating %7.1f us, %5.1f round trips; rules.Floating %5.1f us, %4.1f round trips'
+              ' per window (%d of %d float; %r)'
+              % (len(float_rules), stock_us, stock_trips, us, trips, sum(floats), len(floats), compiled.matcher))
+
+if __name__ == '__main__':
+    main()
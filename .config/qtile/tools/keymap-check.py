@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+#
+# KEYMAP-CHECK
+# Prints keymap.py's report for the qtile config: conflicting bindings, commands
+# bound more than once and .when() alternatives for layouts that are not
+# configured. Loading config.py needs qtile and qtile-extras, as on the desktop
+# itself; without them only the benchmark runs.
+#
+# The benchmark compiles keymaps of 64 (about this config), 500 and 5000
+# bindings, some of them inside chords, and times resolving a key press
+# through the compiled tables against scanning the list of bindings, for keys
+# spread over the whole list and for keys that are not bound at all.
+#
+# Usage: keymap-check.py [--bench]
+
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+here = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, here)
+
+import keymap
+
+LOOKUPS = 100000
+
+def report():
+    try:
+        import config
+    except Exception as e:
+        print('config.py not loaded (%s: %s); benchmark only' % (type(e).__name__, e))
+        return
+    print(keymap.compile(config.keys, config.layouts).report())
+
+# Stand-ins with the attributes keymap.py reads from Key, KeyChord and LazyCall.
+# Every 50th binding is a chord holding the next few bindings after it.
+def make_keys(count):
+    names = [chr(c) for c in range(ord('a'), ord('z') + 1)] + ['F%d' % i for i in range(1, 13)]
+    modifiers = [['mod4'], ['mod4', 'shift'], ['mod4', 'control'], ['mod1'], ['control'], ['mod4', 'mod1']]
+    keys = []
+    chord = None
+    for i in range(count):
+        command = SimpleNamespace(selectors=[], name='spawn', args=('command-%d' % i,), kwargs={})
+        if chord is not None and len(chord.submappings) < 5:
+            chord.submappings.append(SimpleNamespace(modifiers=[], key=names[len(chord.submappings)],
+                                                     commands=(command,), desc=''))
+            continue
+        chord = None
+        n = len(keys)
+        mods = modifiers[n % len(modifiers)]
+        name = names[n // len(modifiers) % len(names)]
+        if n >= len(modifiers) * len(names):
+            name += '_%d' % (n // (len(modifiers) * len(names)))
+        if i % 50 == 0:
+            chord = SimpleNamespace(modifiers=mods, key=name, submappings=[], desc='')
+            keys.append(chord)
+        else:
+            keys.append(SimpleNamespace(modifiers=mods, key=name, commands=(command,), desc=''))
+    rng = random.Random(count)
+    rng.shuffle(keys)
+    return keys
+
+def bench(count):
+    keys = make_keys(count)
+    start = time.perf_counter()
+    compiled = keymap.compile(keys)
+    compile_ms = (time.perf_counter() - start) * 1000
+    assert not compiled.conflicts, compiled.conflicts
+
+    # What a dispatcher without the tables does: compare every top level binding
+    flat = [(keymap.stroke(binding)[0], binding) for binding in keys]
+    def scan(step):
+        for bound, binding in flat:
+            if bound == step:
+                return binding
+        return None
+
+    bound = [keymap.stroke(binding)[0] for binding in keys]
+    missing = keymap.Stroke(keymap.MODMASKS['mod5'], 'nosuchkey')
+    presses = [bound[i * len(bound) // LOOKUPS] for i in range(LOOKUPS)]
+    table = compiled.tables[()]
+    results = []
+    for label, lookup, steps in (('table, bound keys', table.get, presses),
+                                 ('scan, bound keys', scan, presses),
+                                 ('table, unbound key', table.get, [missing] * LOOKUPS),
+                                 ('scan, unbound key', scan, [missing] * LOOKUPS)):
+        start = time.perf_counter()
+        for step in steps:
+            lookup(step)
+        results.append((label, (time.perf_counter() - start) * 1e9 / len(steps)))
+    print('bindings: %d, chords: %d, compile: %.2f ms' % (len(compiled), len(compiled.tables) - 1, compile_ms))
+    for label, ns in results:
+        print('  %-20s %8.0f ns per key press' % (label, ns))
+
+def main():
+    if '--bench' not in sys.argv[1:]:
+        report()
+        print()
+    for count in (64, 500, 5000):
+        bench(count)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+#
+# WINOPS-BENCH
+# Times minimizing and restoring every window of a group, moving all of them to
+# another group and swapping the groups of two screens, one window at a time as
+# the config used to and through winops.batch (see winops.py), for groups of
+# 10, 50 and 200 windows.
+#
+# The groups are qtile's own (libqtile.group._Group); the windows, layouts and
+# X connection are stand-ins that behave like the X11 backend's as far as the
+# group is concerned and count what would go to the X server: layout passes,
+# requests (configure, map, unmap, focus, event masks) and flushes. Times are
+# for the Python side only, without the server.
+#
+# Usage: winops-bench.py
+
+import contextlib
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+here = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, here)
+
+from libqtile import hook
+from libqtile.group import _Group
+import libqtile.backend.base.window     # hook.fire looks for internal windows
+
+import winops
+
+SIZES = (10, 50, 200)
+
+class Counts:
+    def __init__(self):
+        self.passes = self.requests = self.flushes = 0
+
+counts = Counts()
+
+class Core:
+    def __init__(self, qtile):
+        self.qtile = qtile
+
+    # Every managed window has its enter and focus events masked, then unmasked
+    @contextlib.contextmanager
+    def masked(self):
+        counts.requests += len(self.qtile.windows_map)
+        yield
+        counts.requests += len(self.qtile.windows_map)
+
+    def flush(self):
+        counts.flushes += 1
+
+class Layout:
+    name = 'monadtall'
+
+    def __init__(self):
+        self.clients = []
+
+    def clone(self, group):
+        return type(self)()
+
+    def add_client(self, win):
+        self.clients.append(win)
+
+    def remove(self, win):
+        if win in self.clients:
+            self.clients.remove(win)
+        return self.clients[0] if self.clients else None
+
+    def focus_first(self, group=None):
+        return self.clients[0] if self.clients else None
+
+    def layout(self, windows, rect):
+        counts.passes += 1
+        for win in windows:
+            win.place()
+
+    def focus(self, win):
+        pass
+
+    def blur(self):
+        pass
+
+    def show(self, rect):
+        pass
+
+    def hide(self):
+        pass
+
+class Floating(Layout):
+    name = 'floating'
+
+    def find_clients(self, group):
+        return [win for win in self.clients if win.group is group]
+
+    def match(self, win):
+        return False
+
+    def to_screen(self, group, screen):
+        pass
+
+class Window:
+    def __init__(self, qtile, wid):
+        self.qtile = qtile
+        self.wid = wid
+        self.group = None
+        self.state = 'tiled'
+        self.hidden = True
+        self.fullscreen = self.wants_to_fullscreen = False
+        self.can_steal_focus = True
+
+    def place(self):
+        counts.requests += 1 + self.hidden
+        self.hidden = False
+
+    def hide(self):
+        if not self.hidden:
+            counts.requests += 1
+            self.hidden = True
+
+    def focus(self, warp=True):
+        counts.requests += 2
+
+    @property
+    def floating(self):
+        return self.state != 'tiled'
+
+    @floating.setter
+    def floating(self, do_float):
+        if do_float and self.state == 'tiled':
+            self.state = 'floating'
+            self.place()
+            self.group.mark_floating(self, True)
+            hook.fire('float_change')
+        elif not do_float and self.state != 'tiled':
+            self.state = 'tiled'
+            self.group.mark_floating(self, False)
+            hook.fire('float_change')
+
+    @property
+    def minimized(self):
+        return self.state == 'minimized'
+
+    @minimized.setter
+    def minimized(self, do_minimize):
+        if do_minimize and self.state != 'minimized':
+            self.hide()
+            self.state = 'minimized'
+            self.group.mark_floating(self, True)
+            hook.fire('float_change')
+        elif not do_minimize and self.state == 'minimized':
+            self.floating = False
+
+    def toggle_minimize(self):
+        self.minimized = not self.minimized
+
+    def togroup(self, group_name):
+        group = self.qtile.groups_map[group_name]
+        if self.group is group:
+            return
+        self.hide()
+        if self.group:
+            self.group.remove(self)
+        group.add(self)
+
+class Screen:
+    def __init__(self, qtile, index):
+        self.qtile = qtile
+        self.index = index
+        self.group = None
+
+    def get_rect(self):
+        return (1920 * self.index, 0, 1920, 1080)
+
+    # What libqtile.config.Screen.set_group does when both groups are on screens
+    def set_group(self, new_group):
+        g1, g2, s2 = self.group, new_group, new_group.screen
+        s2.group = g1
+        g1.set_screen(s2, False)
+        self.group = g2
+        g2.set_screen(self, False)
+        hook.fire('setgroup')
+
+# A qtile with two screens showing groups 1 and 2, and count windows on group 1
+def setup(count):
+    qtile = SimpleNamespace(_drag=False, windows_map={})
+    qtile.config = SimpleNamespace(cursor_warp=False, focus_previous_on_window_remove=False,
+                                   auto_fullscreen=True, floats_kept_above=True)
+    qtile.core = Core(qtile)
+    qtile.groups = [_Group(str(i)) for i in range(1, 5)]
+    qtile.groups_map = {group.name: group for group in qtile.groups}
+    for group in qtile.groups:
+        group._configure([Layout()], Floating(), qtile)
+    qtile.screens = [Screen(qtile, 0), Screen(qtile, 1)]
+    for screen, group in zip(qtile.screens, qtile.groups):
+        screen.group = group
+        group.set_screen(screen, False)
+    qtile.current_screen = qtile.screens[0]
+    for wid in range(count):
+        win = Window(qtile, wid)
+        qtile.windows_map[wid] = win
+        qtile.groups[0].add(win)
+    return qtile
+
+def one_by_one_minimize(qtile):
+    for win in qtile.groups[0].windows:
+        win.toggle_minimize()
+
+def batched_minimize(qtile):
+    winops.toggle_minimize(qtile, qtile.groups[0].windows)
+
+def one_by_one_move(qtile):
+    for win in list(qtile.groups[0].windows):
+        win.togroup('2')
+
+def batched_move(qtile):
+    winops.to_group(qtile, qtile.groups[0].windows, '2')
+
+def one_by_one_switch(qtile):
+    qtile.current_screen.set_group(qtile.screens[1].group)
+
+def batched_switch(qtile):
+    with winops.batch(qtile):
+        qtile.current_screen.set_group(qtile.screens[1].group)
+
+OPERATIONS = [
+    ('minimize all', one_by_one_minimize, batched_minimize, 1),
+    ('restore all', one_by_one_minimize, batched_minimize, 2),
+    ('move all to next group', one_by_one_move, batched_move, 1),
+    ('switch screens', one_by_one_switch, batched_switch, 1),
+]
+
+# Runs operation `repeat` times on fresh setups, timing and counting the last run only
+def measure(operation, count, repeat):
+    qtile = setup(count)
+    for _ in range(repeat - 1):
+        operation(qtile)
+    global counts
+    counts = Counts()
+    start = time.perf_counter()
+    operation(qtile)
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000, counts
+
+def main():
+    print('%-24s %7s  %-38s %s' % ('', 'windows', 'one by one', 'winops.batch'))
+    for label, plain, batched, repeat in OPERATIONS:
+        for count in SIZES:
+            row = []
+            for operation in (plain, batched):
+                ms, result = measure(operation, count, repeat)
+                row.append('%8.2f ms %5d passes %6d requests %d flushes'
+                           % (ms, result.passes, result.requests, result.flushes))
+            print('%-24s %7d  %s  |  %s' % (label, count, row[0], row[1]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+##### CACHED UPDATE CHECKER #####
+# widget.CheckUpdates ran `checkupdates` on every poll of every bar, so three
+# screens meant three package database syncs every half hour, each blocking the
+# widget until it finished.
+#
+# Here the bar only ever reads a small JSON cache, which is instant. When the
+# cache is older than its TTL, or pacman's local database has changed since the
+# last check (you just ran pacman -Syu), one worker process is started in the
+# background to run checkupdates and rewrite the cache. The worker takes a lock
+# on the cache, so however many bars or qtile instances ask, only one check runs.
+#
+# The worker is this file run as a script, which also makes it easy to try with
+# a fake checker:
+#       python3 updates.py --refresh --command tools/fake-checkupdates --cache /tmp/updates.json
+
+import argparse
+import asyncio
+import fcntl
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+CACHE = os.path.expanduser('~/.cache/qtile/checkupdates.json')
+PACMAN_DB = '/var/lib/pacman/local'
+COMMAND = ['checkupdates']
+# Seconds before a hung check (stuck mirror, held pacman lock) is killed
+TIMEOUT = 300
+
+# Modification time of pacman's local database, 0 when there is none
+def db_mtime(db=PACMAN_DB):
+    try:
+        return os.stat(db).st_mtime
+    except OSError:
+        return 0.0
+
+def read_cache(path=CACHE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_cache(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(data, f)
+    os.replace(path + '.tmp', path)
+
+# Runs the check and rewrites the cache. checkupdates exits 0 with one line per
+# update, 2 when there is nothing to update and 1 on errors; an error, or a
+# check still running after timeout seconds, keeps the previous count and is
+# retried sooner than a normal refresh.
+def run_check(command=COMMAND, path=CACHE, db=PACMAN_DB, timeout=TIMEOUT):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.lock', 'w') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return read_cache(path)
+        mtime = db_mtime(db)
+        started = time.time()
+        try:
+            # In a session of its own, so a timeout also kills the pacman
+            # checkupdates runs, which would otherwise keep its lock
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                       text=True, start_new_session=True)
+            try:
+                stdout, _ = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+                process.wait()
+                raise
+            ok = process.returncode in (0, 2)
+            count = len([line for line in stdout.splitlines() if line.strip()])
+        except (OSError, subprocess.TimeoutExpired):
+            ok, count = False, 0
+        data = read_cache(path)
+        data.update({'checked': started, 'db_mtime': mtime, 'error': not ok,
+                     'duration': time.time() - started})
+        if ok:
+            data['count'] = count
+        write_cache(path, data)
+        return data
+
+class UpdateChecker:
+    def __init__(self, command=COMMAND, cache=CACHE, db=PACMAN_DB, ttl=1800, retry=300, on_change=None):
+        self.command = command
+        self.cache = cache
+        self.db = db
+        self.ttl = ttl
+        self.retry = retry
+        self.on_change = on_change
+        self.data = read_cache(cache)
+        self.worker = None
+
+    def stale(self):
+        if not self.data:
+            return True
+        if self.data.get('db_mtime') != db_mtime(self.db):
+            return True
+        age = time.time() - self.data.get('checked', 0)
+        return age > (self.retry if self.data.get('error') else self.ttl)
+
+    # Number of pending updates from the cache, starting a background refresh
+    # first if the cache is stale. Never blocks; meant for the bar's event loop.
+    def count(self):
+        if self.worker is None and self.stale():
+            self.worker = asyncio.get_event_loop().create_task(self.refresh())
+        return self.data.get('count', 0)
+
+    async def refresh(self):
+        try:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, os.path.abspath(__file__), '--refresh',
+                '--cache', self.cache, '--db', self.db, '--command', *self.command,
+                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+            await process.wait()
+        finally:
+            self.worker = None
+        count = self.data.get('count')
+        self.data = read_cache(self.cache)
+        if self.on_change is not None and self.data.get('count') != count:
+            self.on_change()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cached checkupdates for the qtile bar.')
+    parser.add_argument('--refresh', action='store_true', help='run the check now and rewrite the cache')
+    parser.add_argument('--cache', default=CACHE)
+    parser.add_argument('--db', default=PACMAN_DB)
+    parser.add_argument('--timeout', type=float, default=TIMEOUT, help='seconds before the check is given up')
+    parser.add_argument('--command', nargs=argparse.REMAINDER, default=COMMAND)
+    args = parser.parse_args()
+    data = run_check(args.command, args.cache, args.db, args.timeout) if args.refresh else read_cache(args.cache)
+    print(data.get('count', 0))
@@ -0,0 +1,73 @@
+##### BULK WINDOW OPERATIONS #####
+# Minimizing, floating or moving a window makes its group lay out all of its
+# windows again (Group.layout_all, from mark_floating, focus, add and remove),
+# and every layout pass masks and unmasks the events of every window qtile
+# manages. Doing that to each window of a group in turn costs a full layout per
+# window: with 30 windows minimize_all could be watched going through them one
+# by one.
+#
+# batch() suspends layout_all on every group while its block runs and only
+# notes which groups asked for it. When the block ends each of those groups is
+# laid out once, in the order they first asked (so focus ends up where it would
+# have), and the X connection is flushed once.
+#
+#       with winops.batch(qtile):
+#           for win in windows:
+#               win.toggle_minimize()
+#
+# minimize(), toggle_minimize(), set_floating() and to_group() do just that for
+# a list of windows. Batches nest; only the outermost one lays out.
+
+import contextlib
+
+@contextlib.contextmanager
+def batch(qtile):
+    requested = {}      # group -> (warp, focus) for its one layout pass
+    suspended = []
+
+    def defer(group):
+        def layout_all(warp=False, focus=True):
+            previous = requested.get(group, (False, False))
+            requested[group] = (previous[0] or warp, previous[1] or focus)
+        return layout_all
+
+    for group in qtile.groups:
+        if 'layout_all' not in vars(group):     # not suspended by an outer batch
+            group.layout_all = defer(group)
+            suspended.append(group)
+    try:
+        yield
+    finally:
+        for group in suspended:
+            del group.layout_all
+        # Inside an outer batch this just passes the requests on to it
+        for group, (warp, focus) in requested.items():
+            group.layout_all(warp=warp, focus=focus)
+        if suspended:
+            qtile.core.flush()
+
+def minimize(qtile, windows, minimized=True):
+    with batch(qtile):
+        for win in list(windows):
+            if hasattr(win, 'minimized'):
+                win.minimized = minimized
+
+# Each window flips on its own, as toggle_minimize does
+def toggle_minimize(qtile, windows):
+    with batch(qtile):
+        for win in list(windows):
+            if hasattr(win, 'toggle_minimize'):
+                win.toggle_minimize()
+
+def set_floating(qtile, windows, floating=True):
+    with batch(qtile):
+        for win in list(windows):
+            if hasattr(win, 'floating'):
+                win.floating = floating
+
+def to_group(qtile, windows, group_name, switch_group=False):
+    with batch(qtile):
+        for win in list(windows):
+            win.togroup(group_name)
+        if switch_group:
+            qtile.groups_map[group_name].toscreen()